@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # connect the karma write hooks that keep the cached rankings current
+        from .leaderboard import leaderboard_helper  # noqa: F401
+        # and the hook that drops cached integration tokens when they are rotated
+        from .integrations import integrations_helper  # noqa: F401
+        # and the hooks that drop cached profiles when their karma, roles or links change
+        from .dashboard.profile import profile_helper  # noqa: F401
+        # and the hooks that keep learning circle karma ranked
+        from .dashboard.lc import dash_lc_helper  # noqa: F401
+        # and the hook that drops the cached list of published hackathons
+        from .hackathon import hackathon_helper  # noqa: F401
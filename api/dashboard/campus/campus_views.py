@@ -170,10 +170,10 @@ class CampusStudentDetailsCSVAPI(APIView):
             )
         )
 
-        serializer = serializers.CampusStudentDetailsSerializer(
-            user_org_links, many=True, context={"ranks": ranks}
+        rows = CommonUtils.serialize_in_chunks(
+            user_org_links, serializers.CampusStudentDetailsSerializer, context={"ranks": ranks}
         )
-        return CommonUtils.generate_csv(serializer.data, "Campus Student Details")
+        return CommonUtils.generate_csv(rows, "Campus Student Details")
 
 
 class WeeklyKarmaAPI(APIView):
@@ -5,7 +5,8 @@ from rest_framework import serializers
 
 from db.organization import UserOrganizationLink
 from db.task import KarmaActivityLog, Level, TotalKarma, UserLvlLink
-from utils.types import OrganizationType
+from utils import karma_rollup
+from utils.karma_rollup import OrgKarmaRollup
 from utils.utils import DateTimeUtils
 
 
@@ -33,47 +34,16 @@ class CampusDetailsSerializer(serializers.ModelSerializer):
         ]
 
     def get_total_members(self, obj):
-        return obj.org.user_organization_link_org.count()
+        return OrgKarmaRollup.get(karma_rollup.ORG, obj.org_id)["members"]
 
     def get_active_members(self, obj):
-        last_month = DateTimeUtils.get_current_utc_time() - timedelta(days=30)
-        return obj.org.user_organization_link_org.filter(
-            verified=True,
-            user__active=True,
-            user__total_karma_user__isnull=False,
-            user__total_karma_user__created_at__gte=last_month,
-        ).count()
+        return OrgKarmaRollup.get(karma_rollup.ORG, obj.org_id)["active_members"]
 
     def get_total_karma(self, obj):
-        return (
-            obj.org.user_organization_link_org.filter(
-                org__org_type=OrganizationType.COLLEGE.value,
-                verified=True,
-                user__total_karma_user__isnull=False,
-            ).aggregate(total_karma=Sum("user__total_karma_user__karma"))["total_karma"]
-            or 0
-        )
+        return OrgKarmaRollup.get(karma_rollup.ORG, obj.org_id)["verified_karma"]
 
     def get_rank(self, obj):
-        org_karma_dict = (
-            UserOrganizationLink.objects.all()
-            .values("org")
-            .annotate(total_karma=Sum("user__total_karma_user__karma"))
-        )
-
-        rank_dict = {
-            data["org"]: data["total_karma"] if data["total_karma"] is not None else 0
-            for data in org_karma_dict
-        }
-
-        sorted_rank_dict = dict(
-            sorted(rank_dict.items(), key=lambda x: x[1], reverse=True)
-        )
-
-        if obj.org.id in sorted_rank_dict:
-            keys_list = list(sorted_rank_dict.keys())
-            position = keys_list.index(obj.org.id)
-            return position + 1
+        return OrgKarmaRollup.get(karma_rollup.ORG, obj.org_id)["rank"]
 
 
 class CampusStudentDetailsSerializer(serializers.Serializer):
@@ -1,11 +1,11 @@
-from itertools import islice
-
-from django.db.models import Sum, F, Case, CharField, When
+from django.db.models import F, Case, CharField, When
 from rest_framework.views import APIView
 
-from db.organization import UserOrganizationLink, Organization
+from db.organization import Organization
 from db.task import Level, TotalKarma
 from db.user import User
+from utils import karma_rollup
+from utils.karma_rollup import OrgKarmaRollup
 from utils.permission import CustomizePermission, JWTUtils, role_required
 from utils.response import CustomResponse
 from utils.types import RoleType, OrganizationType
@@ -39,30 +39,16 @@ class DistrictTopThreeCampusAPI(APIView):
 
         user_org_link = get_user_college_link(user_id)
 
-        org_karma_dict = (
-            UserOrganizationLink.objects.filter(
-                org__district=user_org_link.org.district,
-                verified=True,
-            )
-            .values("org")
-            .annotate(total_karma=Sum("user__total_karma_user__karma"))
-        )
-
-        org_ranks = {
-            data["org"]: data["total_karma"] if data["total_karma"] is not None else 0
-            for data in org_karma_dict
-        }
-
-        sorted_org_ranks = dict(
-            sorted(org_ranks.items(), key=lambda x: x[1], reverse=True)
+        top_three_orgs = dict(
+            OrgKarmaRollup.get_top(karma_rollup.ORG, user_org_link.org.district_id)
         )
 
-        top_three_orgs = dict(islice(sorted_org_ranks.items(), 3))
-
-        user_org = Organization.objects.filter(id__in=top_three_orgs).distinct()
+        user_org = Organization.objects.in_bulk(list(top_three_orgs))
 
         serializer = dash_district_serializer.DistrictTopThreeCampusSerializer(
-            user_org, many=True, context={"ranks": org_ranks}
+            [user_org[org_id] for org_id in top_three_orgs if org_id in user_org],
+            many=True,
+            context={"ranks": top_three_orgs},
         )
 
         return CustomResponse(response=serializer.data).get_success_response()
@@ -188,10 +174,10 @@ class DistrictStudentDetailsCSVAPI(APIView):
             )
         )
 
-        serializer = dash_district_serializer.DistrictStudentDetailsSerializer(
-            user_org_links, many=True, context={"ranks": ranks}
+        rows = CommonUtils.serialize_in_chunks(
+            user_org_links, dash_district_serializer.DistrictStudentDetailsSerializer, context={"ranks": ranks}
         )
-        return CommonUtils.generate_csv(serializer.data, "District Student Details")
+        return CommonUtils.generate_csv(rows, "District Student Details")
 
 
 class DistrictsCollageDetailsAPI(APIView):
@@ -297,7 +283,7 @@ class DistrictsCollageDetailsCSVAPI(APIView):
             )
         )
 
-        serializer = dash_district_serializer.DistrictCollegeDetailsSerializer(
-            organizations, many=True, context={"leads": leads}
+        rows = CommonUtils.serialize_in_chunks(
+            organizations, dash_district_serializer.DistrictCollegeDetailsSerializer, context={"leads": leads}
         )
-        return CommonUtils.generate_csv(serializer.data, "District College Details")
+        return CommonUtils.generate_csv(rows, "District College Details")
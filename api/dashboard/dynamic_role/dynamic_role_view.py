@@ -1,6 +1,6 @@
 from rest_framework.views import APIView
 from db.user import Role, DynamicRole
-from utils.permission import CustomizePermission, JWTUtils, role_required
+from utils.permission import CustomizePermission, DynamicRoleCache, JWTUtils, role_required
 from utils.response import CustomResponse
 from .dynamic_role_serializer import DynamicRoleCreateSerializer, DynamicRoleListSerializer
 from utils.utils import DateTimeUtils
@@ -19,6 +19,7 @@ class DynamicRoleAPI(APIView):
         serializer = DynamicRoleCreateSerializer(data=data, context={'request': request})
         if serializer.is_valid():
             serializer.save()
+            DynamicRoleCache.invalidate()
             return CustomResponse(general_message='Dynamic Role created successfully', response=serializer.data).get_success_response()
         return CustomResponse(message=serializer.errors).get_failure_response()
 
@@ -34,6 +35,7 @@ class DynamicRoleAPI(APIView):
         role = request.data['role']
         if dynamic_role := DynamicRole.objects.filter(type=type, role__title=role).first():
             dynamic_role.delete()
+            DynamicRoleCache.invalidate()
             return CustomResponse(
                 general_message=f'Dynamic Role of type {type} and role {role} deleted successfully'
                 ).get_success_response()
@@ -56,6 +58,7 @@ class DynamicRoleAPI(APIView):
             dynamic_role.updated_by_id = user_id
             dynamic_role.updated_at = DateTimeUtils.get_current_utc_time()
             dynamic_role.save()
+            DynamicRoleCache.invalidate()
             serializer = DynamicRoleListSerializer({'type':type})
             return CustomResponse(
                 general_message=f'Dynamic Role of type {type} and role {role} updated successfully',
@@ -0,0 +1,279 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from api.dashboard.ig.dash_ig_view import InterestGroupCSV
+from api.dashboard.organisation.organisation_views import InstitutionCSV
+from api.dashboard.roles.dash_roles_views import RoleManagementCSV
+from api.dashboard.task.dash_task_view import TaskListCSV
+from api.dashboard.user.dash_user_views import UserManagementCSV
+from utils.types import RoleType
+from utils.utils import CommonUtils
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+EXPORT_TTL = 60 * 60 * 24
+# running jobs touch their lock file this often; a lock untouched for EXPORT_STALE_AFTER
+# belongs to a worker that died, and its job is queued again up to MAX_ATTEMPTS times
+HEARTBEAT_INTERVAL = 60
+EXPORT_STALE_AFTER = 60 * 10
+MAX_ATTEMPTS = 2
+POLL_INTERVAL = 30
+
+# export name -> (roles allowed to request it, view providing get_rows, url params it takes)
+EXPORTS = {
+    "users": ([RoleType.ADMIN.value], UserManagementCSV, ()),
+    "tasks": ([RoleType.ADMIN.value], TaskListCSV, ()),
+    "interest-groups": ([RoleType.ADMIN.value], InterestGroupCSV, ()),
+    "roles": ([RoleType.ADMIN.value], RoleManagementCSV, ()),
+    "institutions": ([RoleType.ADMIN.value], InstitutionCSV, ("org_type",)),
+}
+
+
+class ExportJobStore:
+    """
+    Export jobs kept as JSON files next to their output under settings.EXPORT_ROOT.
+
+    Job files are replaced atomically and claimed with an exclusive lock file, so any
+    number of web and worker processes can share one directory.
+    """
+
+    @staticmethod
+    def _directory(name):
+        directory = os.path.join(settings.EXPORT_ROOT, name)
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    @staticmethod
+    def job_path(job_id):
+        return os.path.join(ExportJobStore._directory("jobs"), f"{job_id}.json")
+
+    @staticmethod
+    def lock_path(job_id):
+        return os.path.join(ExportJobStore._directory("jobs"), f"{job_id}.lock")
+
+    @staticmethod
+    def file_path(job_id):
+        return os.path.join(ExportJobStore._directory("files"), f"{job_id}.csv.gz")
+
+    @staticmethod
+    def save(job):
+        path = ExportJobStore.job_path(job["id"])
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(job, file)
+        os.replace(f"{path}.tmp", path)
+
+    @staticmethod
+    def get(job_id):
+        try:
+            uuid.UUID(job_id)
+            with open(ExportJobStore.job_path(job_id)) as file:
+                return json.load(file)
+        except (ValueError, OSError):
+            return None
+
+    @staticmethod
+    def create(export, params, user_id):
+        job = {
+            "id": str(uuid.uuid4()),
+            "export": export,
+            "params": params,
+            "status": QUEUED,
+            "created_by": user_id,
+            "created_at": time.time(),
+            "finished_at": None,
+            "size": None,
+            "error": None,
+        }
+        ExportJobStore.save(job)
+        return job
+
+    @staticmethod
+    def claim(job_id):
+        lock_path = ExportJobStore.lock_path(job_id)
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return None
+        os.close(fd)
+
+        job = ExportJobStore.get(job_id)
+        if job is None or job["status"] != QUEUED:
+            # not ours to run, and a lock left behind would keep it from being queued again
+            os.remove(lock_path)
+            return None
+        job["status"] = RUNNING
+        job["attempts"] = job.get("attempts", 0) + 1
+        ExportJobStore.save(job)
+        return job
+
+    @staticmethod
+    def recover_stale():
+        """
+        Queues again the running jobs whose worker stopped touching their lock file, or
+        fails them once they ran out of attempts.
+        """
+        for job_id in ExportJobStore.job_ids():
+            lock_path = ExportJobStore.lock_path(job_id)
+            try:
+                if os.path.getmtime(lock_path) >= time.time() - EXPORT_STALE_AFTER:
+                    continue
+            except FileNotFoundError:
+                continue
+            job = ExportJobStore.get(job_id)
+            if job is None or job["status"] != RUNNING:
+                continue
+
+            if job.get("attempts", 1) < MAX_ATTEMPTS:
+                logger.warning("Export %s was left running, queueing it again", job_id)
+                job["status"] = QUEUED
+            else:
+                logger.error("Export %s was left running, giving up", job_id)
+                job.update(status=FAILED, error="Export worker stopped", finished_at=time.time())
+            ExportJobStore.save(job)
+            if job["status"] == QUEUED:
+                try:
+                    os.remove(lock_path)
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def job_ids():
+        entries = [
+            entry
+            for entry in os.scandir(ExportJobStore._directory("jobs"))
+            if entry.name.endswith(".json")
+        ]
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        return [entry.name.removesuffix(".json") for entry in entries]
+
+    @staticmethod
+    def queued_ids():
+        return [
+            job_id
+            for job_id in ExportJobStore.job_ids()
+            if not os.path.exists(ExportJobStore.lock_path(job_id))
+        ]
+
+    @staticmethod
+    def purge_expired():
+        for job_id in ExportJobStore.job_ids():
+            job = ExportJobStore.get(job_id)
+            if job and job["created_at"] < time.time() - EXPORT_TTL:
+                for path in (
+                    ExportJobStore.file_path(job_id),
+                    ExportJobStore.lock_path(job_id),
+                    ExportJobStore.job_path(job_id),
+                ):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+
+def run_export_job(job):
+    _, view, param_names = EXPORTS[job["export"]]
+    path = ExportJobStore.file_path(job["id"])
+    try:
+        rows = view.get_rows(**{name: job["params"][name] for name in param_names})
+        heartbeat_at = time.monotonic()
+        with open(f"{path}.tmp", "wb") as file:
+            for data in CommonUtils.iter_gzipped_csv(rows):
+                file.write(data)
+                if time.monotonic() - heartbeat_at > HEARTBEAT_INTERVAL:
+                    os.utime(ExportJobStore.lock_path(job["id"]))
+                    heartbeat_at = time.monotonic()
+        os.replace(f"{path}.tmp", path)
+        job.update(status=DONE, size=os.path.getsize(path))
+    except Exception as e:
+        logger.exception("Export %s failed", job["id"])
+        job.update(status=FAILED, error=str(e))
+    finally:
+        close_old_connections()
+
+    job["finished_at"] = time.time()
+    ExportJobStore.save(job)
+    return job
+
+
+def run_pending_exports():
+    """
+    Runs every queued export job not already claimed by another worker.
+    """
+    for job_id in ExportJobStore.queued_ids():
+        if job := ExportJobStore.claim(job_id):
+            run_export_job(job)
+
+
+class InProcessExportQueue:
+    """
+    Runs export jobs on a background thread of the web process (EXPORT_WORKER=thread).
+
+    Jobs queued by this process run right away. Every POLL_INTERVAL seconds the thread
+    also recovers stale jobs and runs any left queued by other or restarted processes.
+    """
+
+    _queue = queue.Queue()
+    _thread = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def put(cls, job_id):
+        with cls._lock:
+            if cls._thread is None or not cls._thread.is_alive():
+                cls._thread = threading.Thread(target=cls._work, daemon=True)
+                cls._thread.start()
+        cls._queue.put(job_id)
+
+    @classmethod
+    def join(cls):
+        cls._queue.join()
+
+    @classmethod
+    def _work(cls):
+        while True:
+            try:
+                job_id = cls._queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                try:
+                    ExportJobStore.recover_stale()
+                    run_pending_exports()
+                except Exception:
+                    logger.exception("Export worker failed")
+                continue
+            try:
+                if job := ExportJobStore.claim(job_id):
+                    run_export_job(job)
+            finally:
+                cls._queue.task_done()
+
+
+def enqueue_export(export, params, user_id):
+    job = ExportJobStore.create(export, params, user_id)
+    if settings.EXPORT_WORKER == "thread":
+        InProcessExportQueue.put(job["id"])
+    return job
+
+
+def get_job_details(job):
+    return {
+        "id": job["id"],
+        "export": job["export"],
+        "status": job["status"],
+        "size": job["size"],
+        "error": job["error"],
+        "created_at": datetime.fromtimestamp(job["created_at"], timezone.utc),
+        "finished_at": job["finished_at"]
+        and datetime.fromtimestamp(job["finished_at"], timezone.utc),
+    }
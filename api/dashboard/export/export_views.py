@@ -0,0 +1,124 @@
+import os
+import re
+
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework.views import APIView
+
+from utils.permission import CustomizePermission, JWTUtils, role_required
+from utils.response import CustomResponse
+from . import export_helper
+from .export_helper import EXPORTS, ExportJobStore
+
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class ExportCreateAPI(APIView):
+    authentication_classes = [CustomizePermission]
+
+    def post(self, request, export_name):
+        if export_name not in EXPORTS:
+            return CustomResponse(general_message="Invalid export").get_failure_response()
+
+        roles, _, param_names = EXPORTS[export_name]
+        return role_required(roles)(ExportCreateAPI.enqueue)(
+            self, request, export_name, param_names
+        )
+
+    def enqueue(self, request, export_name, param_names):
+        params = {name: request.data.get(name) for name in param_names}
+        if missing := [name for name, value in params.items() if not value]:
+            return CustomResponse(
+                general_message=f"Missing {', '.join(missing)}"
+            ).get_failure_response()
+
+        job = export_helper.enqueue_export(
+            export_name, params, JWTUtils.fetch_user_id(request)
+        )
+        return CustomResponse(
+            general_message="Export queued", response=export_helper.get_job_details(job)
+        ).get_success_response()
+
+
+class ExportJobAPI(APIView):
+    authentication_classes = [CustomizePermission]
+
+    def get(self, request, job_id):
+        job = ExportJobStore.get(job_id)
+        if job is None or job["created_by"] != JWTUtils.fetch_user_id(request):
+            return CustomResponse(general_message="Invalid export job").get_failure_response()
+
+        return CustomResponse(
+            response=export_helper.get_job_details(job)
+        ).get_success_response()
+
+
+class ExportDownloadAPI(APIView):
+    authentication_classes = [CustomizePermission]
+
+    def get(self, request, job_id):
+        job = ExportJobStore.get(job_id)
+        if job is None or job["created_by"] != JWTUtils.fetch_user_id(request):
+            return CustomResponse(general_message="Invalid export job").get_failure_response()
+        if job["status"] != export_helper.DONE:
+            return CustomResponse(
+                general_message=f"Export is {job['status']}"
+            ).get_failure_response()
+
+        path = ExportJobStore.file_path(job_id)
+        size = os.path.getsize(path)
+        etag = f'"{job_id}-{size}"'
+        start, end = 0, size - 1
+
+        range_header = request.META.get("HTTP_RANGE")
+        if_range = request.META.get("HTTP_IF_RANGE")
+        if range_header and (if_range is None or if_range == etag):
+            byte_range = self.parse_range(range_header, size)
+            if byte_range is None:
+                response = HttpResponse(status=416)
+                response["Content-Range"] = f"bytes */{size}"
+                return response
+            start, end = byte_range
+
+        response = StreamingHttpResponse(
+            self.read_file(path, start, end - start + 1),
+            status=206 if (start, end) != (0, size - 1) else 200,
+            content_type="application/gzip",
+        )
+        _, view, param_names = EXPORTS[job["export"]]
+        filename = getattr(view, "export_name", None) or job["params"][param_names[0]]
+        response["Content-Disposition"] = f'attachment; filename="{filename}.csv.gz"'
+        response["Content-Length"] = end - start + 1
+        response["Accept-Ranges"] = "bytes"
+        response["ETag"] = etag
+        if response.status_code == 206:
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return response
+
+    @staticmethod
+    def parse_range(range_header, size):
+        """
+        Returns the (start, end) of a single-range Range header, the whole file for a
+        header that cannot be parsed, or None if the range is not satisfiable.
+        """
+        match = RANGE_PATTERN.fullmatch(range_header.strip())
+        if match is None or match.groups() == ("", ""):
+            return 0, size - 1
+
+        start, end = match.groups()
+        if not start:
+            start, end = max(size - int(end), 0), size - 1
+        else:
+            start, end = int(start), min(int(end), size - 1) if end else size - 1
+
+        if start > end or start >= size:
+            return None
+        return start, end
+
+    @staticmethod
+    def read_file(path, start, length):
+        with open(path, "rb") as file:
+            file.seek(start)
+            while length > 0 and (data := file.read(min(READ_CHUNK_SIZE, length))):
+                length -= len(data)
+                yield data
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import export_views
+
+urlpatterns = [
+    path('jobs/<str:job_id>/', export_views.ExportJobAPI.as_view()),
+    path('jobs/<str:job_id>/download/', export_views.ExportDownloadAPI.as_view()),
+    path('<str:export_name>/', export_views.ExportCreateAPI.as_view()),
+]
@@ -74,13 +74,16 @@ class InterestGroupAPI(APIView):
 
 class InterestGroupCSV(APIView):
     authentication_classes = [CustomizePermission]
+    export_name = 'Interest Group'
 
     @role_required([RoleType.ADMIN.value, ])
     def get(self, request):
-        ig_serializer = InterestGroup.objects.all()
-        ig_serializer_data = InterestGroupSerializer(ig_serializer, many=True).data
+        return CommonUtils.generate_csv(self.get_rows(), self.export_name)
 
-        return CommonUtils.generate_csv(ig_serializer_data, 'Interest Group')
+    @staticmethod
+    def get_rows():
+        ig_serializer = InterestGroup.objects.all()
+        return CommonUtils.serialize_in_chunks(ig_serializer, InterestGroupSerializer)
 
 
 class InterestGroupGetAPI(APIView):
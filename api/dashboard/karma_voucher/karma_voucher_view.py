@@ -5,17 +5,25 @@ from db.user import User
 from utils.permission import CustomizePermission, JWTUtils, role_required
 from utils.response import CustomResponse
 from utils.utils import ImportCSV, CommonUtils
-from utils.karma_voucher import generate_karma_voucher, generate_ordered_id
+from utils.mail_outbox import MailOutbox
+from utils.karma_voucher import build_voucher_archive, generate_ordered_id, render_karma_vouchers
 from .karma_voucher_serializer import VoucherLogCSVSerializer, VoucherLogSerializer
 from utils.types import RoleType
 
+import csv
+import io
+
 import decouple
 from email.mime.image import MIMEImage
 from django.core.mail import EmailMessage
+from django.http import FileResponse
 
 import uuid
 from utils.utils import DateTimeUtils
 
+# rows matched, saved and rendered together
+VOUCHER_CHUNK_SIZE = 500
+
 
 class ImportVoucherLogAPI(APIView):
     authentication_classes = [CustomizePermission]
@@ -27,45 +35,70 @@ class ImportVoucherLogAPI(APIView):
         except KeyError:
             return CustomResponse(general_message={'File not found.'}).get_failure_response()
         
-        excel_data = ImportCSV()
-        excel_data = excel_data.read_excel_file(file_obj)
-        if not excel_data:
+        headers, rows = ImportCSV.read_rows(file_obj)
+        if not headers:
             return CustomResponse(general_message={'Empty csv file.'}).get_failure_response()
 
         temp_headers = ['karma', 'mail', 'task', 'month', 'week']
-        first_entry = excel_data[0]
         for key in temp_headers:
-            if key not in first_entry:
+            if key not in headers:
                 return CustomResponse(general_message={f'{key} does not exist in the file.'}).get_failure_response()
             
         current_user = JWTUtils.fetch_user_id(request)
-        
-        valid_rows = []
         error_rows = []
-        
-        users_to_fetch = set()
-        tasks_to_fetch = set()
-
-        for row in excel_data[1:]:
-            task_hashtag = row.get('task')
-            mail = row.get('mail')
-            
-            users_to_fetch.add(mail)
-            tasks_to_fetch.add(task_hashtag)
-
-        # Fetch users and tasks in bulk
-        users = User.objects.filter(email__in=users_to_fetch).values('id', 'email', 'first_name', 'last_name')
-        tasks = TaskList.objects.filter(hashtag__in=tasks_to_fetch).values('id', 'hashtag')
+        batches = self.import_vouchers(rows, current_user, error_rows)
+
+        if request.query_params.get('archive') == 'true':
+            return self.archive_response(batches, error_rows)
+
+        from_mail = decouple.config("FROM_MAIL")
+        subject = "Congratulations on earning Karma points!"
+        success_rows = []
+        for voucher_data, vouchers, karma_voucher_images in batches:
+            for row, voucher, karma_voucher_image in zip(voucher_data, vouchers, karma_voucher_images):
+                text = """Greetings from GTech µLearn!
+
+            Great news! You are just one step away from claiming your internship/contribution Karma points. Simply post the Karma card attached to this email in the #task-dropbox channel and include the specified hashtag to redeem your points.
+            Name: {}
+            Email: {}""".format(voucher['name'], row['mail'])
+
+                email = EmailMessage(
+                    subject=subject,
+                    body=text,
+                    from_email=from_mail,
+                    to=[row['mail']],
+                )
+                attachment = MIMEImage(karma_voucher_image)
+                attachment.add_header('Content-Disposition', 'attachment', filename=voucher['name'] + '.jpg')
+                email.attach(attachment)
+                MailOutbox.enqueue(email)
+            success_rows.extend(voucher_data)
+
+        return CustomResponse(response={"Success": success_rows, "Failed": error_rows}).get_success_response()
+
+    @staticmethod
+    def prepare_vouchers(rows, current_user, count, error_rows):
+        """
+        Matches a chunk of rows to their users and tasks with one query each. Returns the
+        voucher log rows, the cards to render for them and the next voucher number.
+        """
+        users = User.objects.filter(email__in={row.get('mail') for row in rows}).values(
+            'id', 'email', 'first_name', 'last_name'
+        )
+        tasks = TaskList.objects.filter(hashtag__in={row.get('task') for row in rows}).values('id', 'hashtag')
 
-        for user in users:
-            user_dict = {user['email']: (
+        user_dict = {
+            user['email']: (
                 user['id'],
                 user['first_name'] if user['last_name'] is None else f"{user['first_name']} {user['last_name']}"
-                )}
+            )
+            for user in users
+        }
         task_dict = {task['hashtag']: task['id'] for task in tasks}
 
-        count = 1
-        for row in excel_data[1:]:
+        valid_rows = []
+        vouchers = []
+        for row in rows:
             task_hashtag = row.get('task')
             karma = row.get('karma')
             mail = row.get('mail')
@@ -76,64 +109,95 @@ class ImportVoucherLogAPI(APIView):
             if user_info is None:
                 row['error'] = f"Invalid email: {mail}"
                 error_rows.append(row)
+                continue
+
+            user_id, full_name = user_info
+            task_id = task_dict.get(task_hashtag)
+            try:
+                karma = int(karma)
+            except (TypeError, ValueError):
+                karma = None
+
+            if task_id is None:
+                row['error'] = f"Invalid task hashtag: {task_hashtag}"
+                error_rows.append(row)
+            elif karma is None:
+                row['error'] = f"Invalid karma: {row.get('karma')}"
+                error_rows.append(row)
+            elif karma == 0:
+                row['error'] = f"Karma cannot be 0"
+                error_rows.append(row)
             else:
-                user_id, full_name = user_info
-
-                task_id = task_dict.get(task_hashtag)
-                
-                if task_id is None:
-                    row['error'] = f"Invalid task hashtag: {task_hashtag}"
-                    error_rows.append(row)
-                elif karma == 0:
-                    row['error'] = f"Karma cannot be 0"
-                    error_rows.append(row)
-                else:
-                    # Prepare valid row data
-                    row['user_id'] = user_id
-                    row['task_id'] = task_id
-                    row['id'] = str(uuid.uuid4())
-                    row['code'] = generate_ordered_id(count)
-                    row['claimed'] = False
-                    row['created_by_id'] = current_user
-                    row['updated_by_id'] = current_user
-                    row['created_at'] = DateTimeUtils.get_current_utc_time()
-                    row['updated_at'] = DateTimeUtils.get_current_utc_time()
-                    count += 1
-                    valid_rows.append(row)
-
-                    # Prepare email context and attachment
-                    from_mail = decouple.config("FROM_MAIL")
-                    subject = "Congratulations on earning Karma points!"
-                    text = """Greetings from GTech µLearn!
-
-                    Great news! You are just one step away from claiming your internship/contribution Karma points. Simply post the Karma card attached to this email in the #task-dropbox channel and include the specified hashtag to redeem your points.
-                    Name: {}
-                    Email: {}""".format(full_name, mail)
-
-                    month_week = month + '/' + week
-                    karma_voucher_image = generate_karma_voucher(
-                        name=str(full_name), karma=str(int(karma)), code=row["code"], hashtag=task_hashtag, month=month_week)
-                    karma_voucher_image.seek(0)
-                    email = EmailMessage(
-                        subject=subject,
-                        body=text,
-                        from_email=from_mail,
-                        to=[mail],
-                    )
-                    attachment = MIMEImage(karma_voucher_image.read())
-                    attachment.add_header('Content-Disposition', 'attachment', filename=str(full_name) + '.jpg')
-                    email.attach(attachment)
-                    email.send(fail_silently=False)
-
-
-        # Serialize and save valid voucher rows
-        voucher_serializer = VoucherLogCSVSerializer(data=valid_rows, many=True)
-        if voucher_serializer.is_valid():
+                # Prepare valid row data
+                row['karma'] = karma
+                row['user_id'] = user_id
+                row['task_id'] = task_id
+                row['id'] = str(uuid.uuid4())
+                row['code'] = generate_ordered_id(count)
+                row['claimed'] = False
+                row['created_by_id'] = current_user
+                row['updated_by_id'] = current_user
+                row['created_at'] = DateTimeUtils.get_current_utc_time()
+                row['updated_at'] = DateTimeUtils.get_current_utc_time()
+                count += 1
+                valid_rows.append(row)
+                vouchers.append({
+                    'name': str(full_name),
+                    'karma': str(karma),
+                    'code': row['code'],
+                    'hashtag': task_hashtag,
+                    'month': f"{month}/{week}",
+                })
+
+        return valid_rows, vouchers, count
+
+    @staticmethod
+    def import_vouchers(rows, current_user, error_rows):
+        """
+        Saves the vouchers of the sheet a chunk at a time and yields the saved rows of
+        every chunk along with their cards and the rendered images, so large sheets are
+        never held in memory as a whole.
+        """
+        count = 1
+        for chunk in ImportCSV.iter_chunks(rows, VOUCHER_CHUNK_SIZE):
+            valid_rows, vouchers, count = ImportVoucherLogAPI.prepare_vouchers(
+                chunk, current_user, count, error_rows
+            )
+
+            # Serialize and save valid voucher rows
+            voucher_serializer = VoucherLogCSVSerializer(data=valid_rows, many=True)
+            if not voucher_serializer.is_valid():
+                error_rows.append(voucher_serializer.errors)
+                continue
             voucher_serializer.save()
-        else:
-            error_rows.append(voucher_serializer.errors)
-                
-        return CustomResponse(response={"Success": voucher_serializer.data, "Failed": error_rows}).get_success_response()
+
+            yield voucher_serializer.data, vouchers, render_karma_vouchers(vouchers)
+
+    @staticmethod
+    def archive_response(batches, error_rows):
+        """
+        Saves the vouchers without mailing them and returns every card in one zip,
+        along with a CSV of the rows that could not be imported.
+        """
+        def files():
+            for _, vouchers, karma_voucher_images in batches:
+                for voucher, karma_voucher_image in zip(vouchers, karma_voucher_images):
+                    yield f"{voucher['code']}-{voucher['name']}.jpg", karma_voucher_image
+
+            if error_rows:
+                failed = io.StringIO()
+                writer = csv.writer(failed)
+                writer.writerow(['mail', 'task', 'error'])
+                for row in error_rows:
+                    if isinstance(row, dict):
+                        writer.writerow([row.get('mail'), row.get('task'), row.get('error')])
+                    else:
+                        writer.writerow(['', '', row])
+                yield 'failed.csv', failed.getvalue()
+
+        return FileResponse(
+            build_voucher_archive(files()), as_attachment=True, filename='karma-vouchers.zip'
+        )
 
 
 class VoucherLogAPI(APIView):
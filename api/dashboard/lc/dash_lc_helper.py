@@ -0,0 +1,191 @@
+import re
+import threading
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from db.learning_circle import LearningCircle, UserCircleLink
+from db.task import KarmaActivityLog, TaskList
+from utils.cache import invalidate_on_commit
+from utils.karma_rank import KarmaIndex
+from utils.utils import DateTimeUtils
+
+CIRCLE_CODE_ATTEMPTS = 3
+STATS_TIMEOUT = 60 * 5
+
+
+def fetch_circle_karma(ig_id=None, circle_ids=None) -> list[tuple[str, str, int]]:
+    """
+    Returns ``(circle_id, ig_id, karma)`` for every learning circle of an interest group
+    (or only ``circle_ids``) with one grouped query. A circle's karma is the approved
+    karma its accepted members earned on tasks of the circle's interest group.
+    """
+    circles = LearningCircle.objects.all()
+    if ig_id is not None:
+        circles = circles.filter(ig_id=ig_id)
+    if circle_ids is not None:
+        circles = circles.filter(id__in=circle_ids)
+
+    return [
+        (circle_id, circle_ig_id, karma or 0)
+        for circle_id, circle_ig_id, karma in circles.annotate(
+            total=Sum(
+                "usercirclelink__user__karma_activity_log_user__karma",
+                filter=Q(
+                    usercirclelink__accepted=True,
+                    usercirclelink__user__karma_activity_log_user__appraiser_approved=True,
+                    usercirclelink__user__karma_activity_log_user__task__ig=F("ig"),
+                ),
+            )
+        ).values_list("id", "ig_id", "total")
+    ]
+
+
+def get_available_circle_code(name: str, ig_code: str, org_code: str) -> str:
+    """
+    Returns the circle code for a new circle: the first two letters of its name, the
+    interest group code and up to four letters of the college code, or else the first
+    free ``<college><ig><name>1``, ``...2``... Takes at most two queries on the unique
+    circle_code index, however many circles exist.
+    """
+    code = f"{name[:2]}{ig_code}{org_code[:4]}".upper()
+    if not LearningCircle.objects.filter(circle_code=code).exists():
+        return code
+
+    prefix = f"{org_code}{ig_code}{name[:2]}".upper()
+    pattern = re.compile(rf"{re.escape(prefix)}(\d+)")
+    taken = set()
+    for circle_code in LearningCircle.objects.filter(circle_code__startswith=prefix).values_list(
+        "circle_code", flat=True
+    ):
+        if match := pattern.fullmatch(circle_code.upper()):
+            taken.add(int(match[1]))
+
+    counter = 1
+    while counter in taken:
+        counter += 1
+    return f"{prefix}{counter}"
+
+
+class CircleKarmaIndex:
+    """
+    In-process karma totals of learning circles, ranked within each interest group.
+
+    The circles of an interest group are loaded with one query the first time one of
+    them is asked for. Karma logs, memberships and circles saved through this service
+    refresh only the circles they touch once they commit; each interest group is
+    reloaded when its index expires to pick up writes made elsewhere.
+    """
+
+    _indexes = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_index(cls, ig_id) -> KarmaIndex:
+        index = cls._indexes.get(ig_id)
+        if index is None or index.is_expired:
+            with cls._lock:
+                index = cls._indexes.get(ig_id)
+                if index is None or index.is_expired:
+                    rows = fetch_circle_karma(ig_id=ig_id)
+                    index = cls._indexes[ig_id] = KarmaIndex(
+                        (circle_id, karma) for circle_id, _, karma in rows
+                    )
+        return index
+
+    @classmethod
+    def get(cls, circle) -> tuple[int, int]:
+        """
+        Returns the karma of a circle and its rank among the circles of its interest
+        group. Circles with the same karma share a rank.
+        """
+        index = cls._get_index(circle.ig_id)
+        if (karma := index.karma.get(circle.id)) is None:
+            # created since the index was loaded
+            cls.refresh([circle.id])
+            karma = index.karma.get(circle.id, 0)
+        return karma, index.count_gt(karma) + 1
+
+    @classmethod
+    def refresh(cls, circle_ids):
+        if not cls._indexes or not circle_ids:
+            return
+        rows = fetch_circle_karma(circle_ids=circle_ids)
+        with cls._lock:
+            for index in cls._indexes.values():
+                for circle_id in circle_ids:
+                    index.remove(circle_id)
+            for circle_id, ig_id, karma in rows:
+                if index := cls._indexes.get(ig_id):
+                    index.update(circle_id, karma)
+
+    @classmethod
+    def refresh_user(cls, user_id, task_id):
+        if not cls._indexes or user_id is None:
+            return
+        ig_id = TaskList.objects.filter(id=task_id).values_list("ig_id", flat=True).first()
+        if ig_id not in cls._indexes:
+            return
+        cls.refresh(
+            list(
+                UserCircleLink.objects.filter(
+                    user_id=user_id, accepted=True, circle__ig_id=ig_id
+                ).values_list("circle_id", flat=True)
+            )
+        )
+
+
+class LearningCircleStats:
+    """
+    Snapshot of how many learning circles there are and how many colleges, interest
+    groups, districts and states they cover, kept in the shared cache.
+
+    The snapshot is taken with one query and dropped whenever a circle is saved or
+    deleted, or after STATS_TIMEOUT; ``updated_at`` says when it was taken.
+    """
+
+    KEY = "learning_circle:stats"
+
+    @classmethod
+    def get(cls) -> dict:
+        if (stats := cache.get(cls.KEY)) is None:
+            stats = LearningCircle.objects.aggregate(
+                state=Count("org__district__zone__state_id", distinct=True),
+                district=Count("org__district_id", distinct=True),
+                interest_group=Count("ig_id", distinct=True),
+                college=Count("org_id", distinct=True),
+                learning_circle=Count("id"),
+            )
+            stats["updated_at"] = DateTimeUtils.get_current_utc_time()
+            cache.set(cls.KEY, stats, STATS_TIMEOUT)
+        return stats
+
+    @classmethod
+    def invalidate(cls):
+        cache.delete(cls.KEY)
+
+
+@receiver(post_save, sender=KarmaActivityLog)
+@receiver(post_delete, sender=KarmaActivityLog)
+def karma_activity_log_changed(sender, instance, **kwargs):
+    user_id, task_id = instance.user_id, instance.task_id
+    transaction.on_commit(lambda: CircleKarmaIndex.refresh_user(user_id, task_id))
+
+
+@receiver(post_save, sender=UserCircleLink)
+@receiver(post_delete, sender=UserCircleLink)
+def user_circle_link_changed(sender, instance, **kwargs):
+    circle_ids = [instance.circle_id]
+    transaction.on_commit(lambda: CircleKarmaIndex.refresh(circle_ids))
+
+
+@receiver(post_save, sender=LearningCircle)
+@receiver(post_delete, sender=LearningCircle)
+def learning_circle_changed(sender, instance, **kwargs):
+    # also moves a circle whose interest group changed to its new ranking
+    circle_ids = [instance.id]
+    transaction.on_commit(lambda: CircleKarmaIndex.refresh(circle_ids))
+    invalidate_on_commit(LearningCircleStats.invalidate)
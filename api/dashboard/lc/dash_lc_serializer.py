@@ -1,13 +1,14 @@
 import uuid
 
-from django.db.models import Sum
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Sum
 from rest_framework import serializers
 
 from db.learning_circle import LearningCircle, UserCircleLink, InterestGroup
 from db.organization import UserOrganizationLink
-from db.task import KarmaActivityLog
 from utils.types import OrganizationType
 from utils.utils import DateTimeUtils
+from .dash_lc_helper import CIRCLE_CODE_ATTEMPTS, CircleKarmaIndex, get_available_circle_code
 
 
 class LearningCircleSerializer(serializers.ModelSerializer):
@@ -77,37 +78,37 @@ class LearningCircleCreateSerializer(serializers.ModelSerializer):
 
         ig = InterestGroup.objects.filter(id=validated_data.get('ig')).first()
 
-        if len(org_link.org.code) > 4:
-            code = validated_data.get('name')[:2] + ig.code + org_link.org.code[:4]
-        else:
-            code = validated_data.get('name')[:2] + ig.code + org_link.org.code
-        existing_codes = set(LearningCircle.objects.values_list('circle_code', flat=True))
-        i = 1
-        while code in existing_codes:
-            code = org_link.org.code + ig.code + validated_data.get('name')[:2] + str(i)
-            i += 1
-
-        lc = LearningCircle.objects.create(
-            id=uuid.uuid4(),
-            name=validated_data.get('name'),
-            circle_code=code.upper(),
-            ig=ig,
-            org=org_link.org,
-            updated_by_id=user_id,
-            updated_at=DateTimeUtils.get_current_utc_time(),
-            created_by_id=user_id,
-            created_at=DateTimeUtils.get_current_utc_time())
-
-        UserCircleLink.objects.create(
-            id=uuid.uuid4(),
-            user=org_link.user,
-            circle=lc,
-            lead=True,
-            accepted=1,
-            accepted_at=DateTimeUtils.get_current_utc_time(),
-            created_at=DateTimeUtils.get_current_utc_time()
-        )
-        return lc
+        # a concurrent create can take the same code between the probe and the insert
+        for _ in range(CIRCLE_CODE_ATTEMPTS):
+            code = get_available_circle_code(validated_data.get('name'), ig.code, org_link.org.code)
+            try:
+                with transaction.atomic():
+                    lc = LearningCircle.objects.create(
+                        id=uuid.uuid4(),
+                        name=validated_data.get('name'),
+                        circle_code=code,
+                        ig=ig,
+                        org=org_link.org,
+                        updated_by_id=user_id,
+                        updated_at=DateTimeUtils.get_current_utc_time(),
+                        created_by_id=user_id,
+                        created_at=DateTimeUtils.get_current_utc_time())
+
+                    UserCircleLink.objects.create(
+                        id=uuid.uuid4(),
+                        user=org_link.user,
+                        circle=lc,
+                        lead=True,
+                        accepted=1,
+                        accepted_at=DateTimeUtils.get_current_utc_time(),
+                        created_at=DateTimeUtils.get_current_utc_time()
+                    )
+            except IntegrityError:
+                if LearningCircle.objects.filter(name=validated_data.get('name')).exists():
+                    raise serializers.ValidationError("A learning circle with this name already exists")
+                continue
+            return lc
+        raise serializers.ValidationError("Could not create the learning circle, try again")
 
 
 class LearningCircleHomeSerializer(serializers.ModelSerializer):
@@ -119,90 +120,61 @@ class LearningCircleHomeSerializer(serializers.ModelSerializer):
     is_lead = serializers.SerializerMethodField()
     is_member = serializers.SerializerMethodField()
 
+    def _get_links(self, obj):
+        """
+        Every membership of the circle with the member and their karma on the circle's
+        interest group, loaded with one grouped query and shared by the fields below.
+        """
+        if getattr(self, "_links", None) is None:
+            self._links = list(
+                UserCircleLink.objects.filter(circle=obj)
+                .select_related("user")
+                .annotate(
+                    ig_karma=Sum(
+                        "user__karma_activity_log_user__karma",
+                        filter=Q(
+                            user__karma_activity_log_user__appraiser_approved=True,
+                            user__karma_activity_log_user__task__ig=obj.ig_id,
+                        ),
+                    )
+                )
+            )
+        return self._links
+
     def get_is_member(self, obj):
         user = self.context.get('user_id')
-        try:
-            if link := UserCircleLink.objects.get(user=user, circle=obj, accepted=True):
-                return True
-        except UserCircleLink.DoesNotExist:
-            return False
+        return any(link.user_id == user and link.accepted for link in self._get_links(obj))
 
     def get_is_lead(self, obj):
         user = self.context.get('user_id')
-        try:
-            if link := UserCircleLink.objects.get(user=user, circle=obj, lead=True):
-                return True
-        except UserCircleLink.DoesNotExist:
-            return False
+        return any(link.user_id == user and link.lead for link in self._get_links(obj))
 
     def get_total_karma(self, obj):
-        return (
-                KarmaActivityLog.objects.filter(
-                    user__usercirclelink__circle=obj,
-                    user__usercirclelink__accepted=True,
-                    task__ig=obj.ig,
-                    appraiser_approved=True,
-                ).aggregate(total_karma=Sum('karma'))['total_karma']
-                or 0
-        )
+        total_karma, _ = CircleKarmaIndex.get(obj)
+        return total_karma
 
     def get_members(self, obj):
-        return self._get_member_info(obj, accepted=1)
+        return self._get_member_info(obj, accepted=True)
 
     def get_pending_members(self, obj):
         return self._get_member_info(obj, accepted=None)
 
     def _get_member_info(self, obj, accepted):
-        members = UserCircleLink.objects.filter(circle=obj, accepted=accepted)
-        member_info = []
-
-        for member in members:
-            total_ig_karma = KarmaActivityLog.objects.filter(
-                task__ig=member.circle.ig,
-                user=member.user,
-                appraiser_approved=True
-            ).aggregate(total_karma=Sum('karma'))['total_karma'] or 0
-
-            member_info.append({
+        return [
+            {
                 'id': member.user.id,
                 'username': f'{member.user.first_name} {member.user.last_name}' if member.user.last_name else member.user.first_name,
                 'profile_pic': member.user.profile_pic or None,
-                'karma': total_ig_karma,
+                'karma': member.ig_karma or 0,
                 'is_lead': member.lead,
-            })
-
-        return member_info
+            }
+            for member in self._get_links(obj)
+            if member.accepted is accepted
+        ]
 
     def get_rank(self, obj):
-        total_karma = KarmaActivityLog.objects.filter(
-            user__usercirclelink__circle=obj,
-            user__usercirclelink__accepted=True,
-            task__ig=obj.ig,
-            appraiser_approved=True
-        ).aggregate(total_karma=Sum('karma'))['total_karma'] or 0
-        circle_ranks = {obj.name: {'total_karma': total_karma}}
-        all_learning_circles = LearningCircle.objects.filter(ig=obj.ig).exclude(id=obj.id)
-
-        for lc in all_learning_circles:
-            total_karma_lc = KarmaActivityLog.objects.filter(
-                user__usercirclelink__circle=lc,
-                user__usercirclelink__accepted=True,
-                task__ig=lc.ig,
-                appraiser_approved=True
-            ).aggregate(total_karma=Sum('karma'))['total_karma'] or 0
-
-            circle_ranks[lc.name] = {'total_karma': total_karma_lc}
-
-        sorted_ranks = sorted(circle_ranks.items(), key=lambda x: x[1]['total_karma'], reverse=True)
-
-        return next(
-            (
-                i + 1
-                for i, (circle_name, data) in enumerate(sorted_ranks)
-                if circle_name == obj.name
-            ),
-            None,
-        )
+        _, rank = CircleKarmaIndex.get(obj)
+        return rank
 
     class Meta:
         model = LearningCircle
@@ -339,39 +311,6 @@ class LearningCircleMainSerializer(serializers.ModelSerializer):
         ]
 
 
-class LearningCircleDataSerializer(serializers.ModelSerializer):
-    state = serializers.SerializerMethodField()
-    district = serializers.SerializerMethodField()
-    interest_group = serializers.SerializerMethodField()
-    college = serializers.SerializerMethodField()
-    learning_circle = serializers.SerializerMethodField()
-
-    class Meta:
-        model = LearningCircle
-        fields = [
-            "state",
-            "district",
-            "interest_group",
-            "college",
-            "learning_circle",
-        ]
-
-    def get_learning_circle(self, obj):
-        return LearningCircle.objects.all().count()
-
-    def get_college(self, obj):
-        return LearningCircle.objects.values('org_id').distinct().count()
-
-    def get_interest_group(self, obj):
-        return LearningCircle.objects.values('ig_id').distinct().count()
-
-    def get_district(self, obj):
-        return LearningCircle.objects.values('org__district_id').distinct().count()
-
-    def get_state(self, obj):
-        return LearningCircle.objects.values('org__district__zone__state_id').distinct().count()
-
-
 class LearningCircleMemberlistSerializer(serializers.ModelSerializer):
     members = serializers.SerializerMethodField()
 
@@ -10,8 +10,8 @@ from utils.response import CustomResponse
 from utils.types import OrganizationType
 from .dash_lc_serializer import LearningCircleSerializer, LearningCircleCreateSerializer, LearningCircleHomeSerializer, \
     LearningCircleUpdateSerializer, LearningCircleJoinSerializer, LearningCircleMeetSerializer, \
-    LearningCircleMainSerializer, LearningCircleNoteSerializer, LearningCircleDataSerializer, \
-    LearningCircleMemberlistSerializer
+    LearningCircleMainSerializer, LearningCircleNoteSerializer, LearningCircleMemberlistSerializer
+from .dash_lc_helper import LearningCircleStats
 
 domain = config("FR_DOMAIN_NAME")
 
@@ -79,7 +79,7 @@ class LearningCircleMeetAPI(APIView):
 class LearningCircleHomeApi(APIView):
     def get(self, request, circle_id):
         user_id = JWTUtils.fetch_user_id(request)
-        learning_circle = LearningCircle.objects.filter(id=circle_id).first()
+        learning_circle = LearningCircle.objects.select_related("org").filter(id=circle_id).first()
         serializer = LearningCircleHomeSerializer(learning_circle, many=False, context={"user_id": user_id})
         return CustomResponse(response=serializer.data).get_success_response()
 
@@ -180,9 +180,7 @@ class LearningCircleMainApi(APIView):
 
 class LearningCircleDataAPI(APIView):
     def get(self, request):
-        all_circles = LearningCircle.objects.all()
-        serializer = LearningCircleDataSerializer(all_circles, many=False)
-        return CustomResponse(response=serializer.data).get_success_response()
+        return CustomResponse(response=LearningCircleStats.get()).get_success_response()
 
 
 class LearningCircleListMembersApi(APIView):
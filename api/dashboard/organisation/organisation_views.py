@@ -1,18 +1,17 @@
 import uuid
 
-from django.db.models import Sum
 from rest_framework.views import APIView
 
 from db.organization import (
     Organization,
-    UserOrganizationLink,
     OrgAffiliation,
     Country,
     State,
     District,
     Zone,
 )
-from db.task import TotalKarma
+from utils import karma_rollup
+from utils.karma_rollup import OrgKarmaRollup
 from utils.permission import CustomizePermission, JWTUtils
 from utils.permission import role_required
 from utils.response import CustomResponse
@@ -33,11 +32,14 @@ class InstitutionCSV(APIView):
 
     @role_required([RoleType.ADMIN.value])
     def get(self, request, org_type):
-        org_objs = Organization.objects.filter(org_type=org_type).prefetch_related(
+        return CommonUtils.generate_csv(self.get_rows(org_type), org_type)
+
+    @staticmethod
+    def get_rows(org_type):
+        org_objs = Organization.objects.filter(org_type=org_type).select_related(
             "affiliation", "district__zone__state__country"
         )
-        orgs_data = OrganisationSerializer(org_objs, many=True).data
-        return CommonUtils.generate_csv(orgs_data, org_type)
+        return CommonUtils.serialize_in_chunks(org_objs, OrganisationSerializer)
 
 
 class InstitutionsAPI(APIView):
@@ -102,35 +104,9 @@ class InstitutionsAPI(APIView):
             return CustomResponse(
                 response={"institution": OrganisationSerializer(org_obj).data}
             ).get_success_response()
-        org_id_list = Organization.objects.filter(org_type=org_type).values_list(
-            "id", flat=True
-        )
-        organisations = UserOrganizationLink.objects.filter(org__in=org_id_list)
-        college_users = {}
-        total_karma_by_college = {}
-        for user_link in organisations:
-            college_users.setdefault(user_link.org.id, []).append(user_link.user)
-
-            total_karma = total_karma_by_college.get(user_link.org.id, 0)
-            total_karma += (
-                TotalKarma.objects.filter(user=user_link.user)
-                .aggregate(total_karma=Sum("karma"))
-                .get("total_karma", 0)
-            )
-            total_karma_by_college[user_link.org.id] = total_karma
-
-        sorted_college_karma = sorted(
-            total_karma_by_college.items(), key=lambda x: x[1], reverse=True
-        )
-        rank = next(
-            (
-                i + 1
-                for i, (college_id, _) in enumerate(sorted_college_karma)
-                if college_id == org_obj.id
-            ),
-            0,
-        )
-        score = sorted_college_karma[rank - 1][1] if rank > 0 else 0
+        rollup = OrgKarmaRollup.get(karma_rollup.ORG, org_obj.id, org_type=org_type)
+        rank = rollup["rank"] or 0
+        score = rollup["karma"] if rank > 0 else 0
 
         return CustomResponse(
             response={
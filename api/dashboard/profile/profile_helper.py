@@ -0,0 +1,105 @@
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from db.organization import UserOrganizationLink
+from db.task import KarmaActivityLog, TotalKarma, UserIgLink, UserLvlLink
+from db.user import User, UserRoleLink, UserSettings
+from utils.cache import invalidate_on_commit
+from utils.karma_rank import KarmaRankIndex
+
+# bulk writes and renamed levels, colleges or interest groups skip the signals below,
+# so a profile is rebuilt from the tables at least this often
+PROFILE_TIMEOUT = 60 * 10
+
+
+class ProfileReadModel:
+    """
+    One document per user with everything the profile pages show except the rank:
+    name, roles, college, level, karma, karma per task type and per interest group.
+
+    Documents live in the shared cache and are dropped whenever one of the rows they
+    are built from is saved or deleted, then rebuilt on the next read. The rank moves
+    with everybody else's karma, so it is looked up in KarmaRankIndex on every read,
+    which first takes the user's karma from the document if it is newer.
+    """
+
+    KEY = "profile:{}"
+    MUID_KEY = "profile:muid:{}"
+
+    @classmethod
+    def _build(cls, user_id) -> dict | None:
+        # imported here, the serializer module imports this one
+        from .profile_serializer import UserProfileSerializer
+
+        user = User.objects.select_related("total_karma_user").filter(id=user_id).first()
+        if user is None:
+            return None
+        profile = dict(UserProfileSerializer(user).data)
+        profile["_read_at"] = time.time()
+        cache.set_many(
+            {cls.KEY.format(user_id): profile, cls.MUID_KEY.format(user.mu_id): user_id},
+            PROFILE_TIMEOUT,
+        )
+        return profile
+
+    @classmethod
+    def get(cls, user_id, roles=None) -> dict | None:
+        """
+        Returns the profile of the user, ranked among the users holding ``roles``, or
+        their own roles when not given. Served from the cache without a query.
+        """
+        if (profile := cache.get(cls.KEY.format(user_id))) is None:
+            if (profile := cls._build(user_id)) is None:
+                return None
+        read_at = profile.pop("_read_at", None)
+        if roles is None:
+            roles = profile["roles"]
+        if (karma := profile["karma"]) is None:
+            profile["rank"] = None
+        elif KarmaRankIndex.get_cohort(roles) == KarmaRankIndex.get_cohort(profile["roles"]):
+            profile["rank"] = KarmaRankIndex.get_rank(roles, karma, user_id, read_at)
+        else:
+            # ranked in a cohort the user is not in, which must not take their karma
+            profile["rank"] = KarmaRankIndex.get_rank(roles, karma)
+        return profile
+
+    @classmethod
+    def get_by_muid(cls, muid) -> dict | None:
+        user_id = cache.get(cls.MUID_KEY.format(muid))
+        if user_id is not None and (profile := cls.get(user_id)) and profile["muid"] == muid:
+            return profile
+        # not cached yet, or the muid changed hands since
+        user_id = User.objects.filter(mu_id=muid).values_list("id", flat=True).first()
+        return None if user_id is None else cls.get(user_id)
+
+    @classmethod
+    def invalidate(cls, user_id):
+        cache.delete(cls.KEY.format(user_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_on_commit(ProfileReadModel.invalidate, instance.id)
+
+
+@receiver(post_save, sender=KarmaActivityLog)
+@receiver(post_delete, sender=KarmaActivityLog)
+@receiver(post_save, sender=TotalKarma)
+@receiver(post_delete, sender=TotalKarma)
+@receiver(post_save, sender=UserRoleLink)
+@receiver(post_delete, sender=UserRoleLink)
+@receiver(post_save, sender=UserIgLink)
+@receiver(post_delete, sender=UserIgLink)
+@receiver(post_save, sender=UserLvlLink)
+@receiver(post_delete, sender=UserLvlLink)
+@receiver(post_save, sender=UserOrganizationLink)
+@receiver(post_delete, sender=UserOrganizationLink)
+@receiver(post_save, sender=UserSettings)
+@receiver(post_delete, sender=UserSettings)
+def profile_row_changed(sender, instance, **kwargs):
+    if instance.user_id is not None:
+        invalidate_on_commit(ProfileReadModel.invalidate, instance.user_id)
@@ -1,15 +1,16 @@
 import uuid
 
 from django.db import transaction
-from django.db.models import F, Prefetch, Q, Sum
+from django.db.models import F, Prefetch, Sum
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
 
 from db.organization import UserOrganizationLink
-from db.task import InterestGroup, KarmaActivityLog, Level, TaskList, TotalKarma, UserIgLink
+from db.task import InterestGroup, KarmaActivityLog, Level, TaskList, UserIgLink
 from db.user import User, UserSettings, Socials
+from utils.karma_rollup import fetch_ig_karma
 from utils.permission import JWTUtils
-from utils.types import OrganizationType, RoleType
+from utils.types import OrganizationType
 from utils.utils import DateTimeUtils
 
 
@@ -55,51 +56,27 @@ class UserProfileSerializer(serializers.ModelSerializer):
         )
 
     def get_is_public(self, obj):
-        return UserSettings.objects.filter(user=obj).first().is_public
+        return bool(UserSettings.objects.filter(user=obj).values_list("is_public", flat=True).first())
 
     def get_roles(self, obj):
         return list(obj.user_role_link_user.values_list("role__title", flat=True).distinct())
 
     def get_college_code(self, obj):
-        if user_org_link := obj.user_organization_link_user.filter(
+        if user_org_link := obj.user_organization_link_user.select_related("org").filter(
                 org__org_type=OrganizationType.COLLEGE.value
         ).first():
             return user_org_link.org.code
         return None
 
     def get_karma(self, obj):
-        return total_karma.karma if (total_karma := obj.total_karma_user) else None
+        return total_karma.karma if (total_karma := getattr(obj, "total_karma_user", None)) else None
 
     def get_rank(self, obj):
-        roles = self.context.get("roles")
-        user_karma = obj.total_karma_user.karma
-        if RoleType.MENTOR.value in roles:
-            ranks = TotalKarma.objects.filter(
-                user__user_role_link_user__role__title=RoleType.MENTOR.value,
-                karma__gte=user_karma,
-            ).count()
-        elif RoleType.ENABLER.value in roles:
-            ranks = TotalKarma.objects.filter(
-                user__user_role_link_user__role__title=RoleType.ENABLER.value,
-                karma__gte=user_karma,
-            ).count()
-        else:
-            ranks = (
-                TotalKarma.objects.filter(karma__gte=user_karma)
-                .exclude(
-                    Q(
-                        user__user_role_link_user__role__title__in=[
-                            RoleType.ENABLER.value,
-                            RoleType.MENTOR.value,
-                        ]
-                    )
-                )
-                .count()
-            )
-        return ranks if ranks > 0 else None
+        # filled in by ProfileReadModel on every read, the cached profile has no rank
+        return None
 
     def get_karma_distribution(self, obj):
-        return (
+        return list(
             KarmaActivityLog.objects.filter(user=obj, appraiser_approved=True)
             .values(task_type=F("task__type__title"))
             .annotate(karma=Sum("karma"))
@@ -107,26 +84,16 @@ class UserProfileSerializer(serializers.ModelSerializer):
         )
 
     def get_level(self, obj):
-        if user_level_link := obj.user_lvl_link_user.first():
+        if user_level_link := obj.user_lvl_link_user.select_related("level").first():
             return user_level_link.level.name
         return None
 
     def get_interest_groups(self, obj):
-        interest_groups = []
-        for ig_link in UserIgLink.objects.filter(user=obj):
-            total_ig_karma = (
-                0
-                if KarmaActivityLog.objects.filter(task__ig=ig_link.ig, user=obj, appraiser_approved=True)
-                   .aggregate(Sum("karma"))
-                   .get("karma__sum")
-                   is None
-                else KarmaActivityLog.objects.filter(task__ig=ig_link.ig, user=obj, appraiser_approved=True)
-                   .aggregate(Sum("karma"))
-                   .get("karma__sum")
-            )
-            interest_groups.append(
-                {"id":ig_link.ig.id,"name": ig_link.ig.name, "karma": total_ig_karma})
-        return interest_groups
+        ig_karma = fetch_ig_karma([obj.id])
+        return [
+            {"id": ig_id, "name": ig_name, "karma": ig_karma.get((obj.id, ig_id)) or 0}
+            for ig_id, ig_name in UserIgLink.objects.filter(user=obj).values_list("ig_id", "ig__name")
+        ]
 
 
 class UserLevelSerializer(serializers.ModelSerializer):
@@ -162,58 +129,6 @@ class UserLevelSerializer(serializers.ModelSerializer):
         return data
 
 
-class UserRankSerializer(ModelSerializer):
-    first_name = serializers.CharField()
-    last_name = serializers.CharField()
-    role = serializers.SerializerMethodField()
-    rank = serializers.SerializerMethodField()
-    karma = serializers.SerializerMethodField()
-    interest_groups = serializers.SerializerMethodField()
-
-    class Meta:
-        model = User
-        fields = ("first_name", "last_name", "role",
-                  "rank", "karma", "interest_groups")
-
-    def get_role(self, obj):
-        roles = self.context.get("roles")
-        return ["Learner"] if len(roles) == 0 else roles
-
-    def get_rank(self, obj):
-        roles = self.context.get("roles")
-        user_karma = obj.total_karma_user.karma
-        if RoleType.MENTOR.value in roles:
-            ranks = TotalKarma.objects.filter(
-                user__user_role_link_user__role__title=RoleType.MENTOR.value,
-                karma__gte=user_karma,
-            ).count()
-        elif RoleType.ENABLER.value in roles:
-            ranks = TotalKarma.objects.filter(
-                user__user_role_link_user__role__title=RoleType.ENABLER.value,
-                karma__gte=user_karma,
-            ).count()
-        else:
-            ranks = (
-                TotalKarma.objects.filter(karma__gte=user_karma)
-                .exclude(
-                    Q(
-                        user__user_role_link_user__role__title__in=[
-                            RoleType.ENABLER.value,
-                            RoleType.MENTOR.value,
-                        ]
-                    )
-                )
-                .count()
-            )
-        return ranks if ranks > 0 else None
-
-    def get_karma(self, obj):
-        return total_karma.karma if (total_karma := obj.total_karma_user) else None
-
-    def get_interest_groups(self, obj):
-        return [ig_link.ig.name for ig_link in UserIgLink.objects.filter(user=obj)]
-
-
 class ShareUserProfileUpdateSerializer(ModelSerializer):
     updated_by = serializers.CharField(required=False)
     updated_at = serializers.CharField(required=False)
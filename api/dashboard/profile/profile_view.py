@@ -1,12 +1,13 @@
 from rest_framework.views import APIView
 
 from db.task import InterestGroup, KarmaActivityLog, Level
-from db.user import User, UserSettings, UserRoleLink, Socials
+from db.user import User, UserSettings, Socials
 from utils.permission import CustomizePermission, JWTUtils
 from utils.response import CustomResponse
 from utils.types import WebHookActions, WebHookCategory
 from utils.utils import DiscordWebhooks
 from . import profile_serializer
+from .profile_helper import ProfileReadModel
 from .profile_serializer import LinkSocials
 
 
@@ -81,42 +82,22 @@ class UserIgEditView(APIView):
 class UserProfileAPI(APIView):
     def get(self, request, muid=None):
         if muid is not None:
-            user = User.objects.filter(mu_id=muid).first()
-            if user is None:
+            profile = ProfileReadModel.get_by_muid(muid)
+            if profile is None:
                 return CustomResponse(
                     general_message="Invalid muid"
                 ).get_failure_response()
 
-            user_settings = UserSettings.objects.filter(user_id=user).first()
-            if not user_settings.is_public:
+            if not profile["is_public"]:
                 return CustomResponse(
                     general_message="Private Profile"
                 ).get_failure_response()
-            user_id = user.id
-            roles = [
-                role.role.title for role in UserRoleLink.objects.filter(user=user)]
         else:
             JWTUtils.is_jwt_authenticated(request)
             user_id = JWTUtils.fetch_user_id(request)
-            roles = JWTUtils.fetch_role(request)
-
-        user = (
-            User.objects.select_related("total_karma_user")
-            .prefetch_related(
-                "user_organization_link_user__org",
-                "user_organization_link_user__department",
-                "user_role_link_user__role",
-                "user_lvl_link_user__level",
-            )
-            .filter(id=user_id)
-            .first()
-        )
-
-        serializer = profile_serializer.UserProfileSerializer(
-            user, many=False, context={"roles": roles}
-        )
+            profile = ProfileReadModel.get(user_id, JWTUtils.fetch_role(request))
 
-        return CustomResponse(response=serializer.data).get_success_response()
+        return CustomResponse(response=profile).get_success_response()
 
 
 class UserLogAPI(APIView):
@@ -209,15 +190,18 @@ class UserLevelsAPI(APIView):
 
 class UserRankAPI(APIView):
     def get(self, request, muid):
-        user = User.objects.filter(mu_id=muid).first()
-        if user is None:
+        profile = ProfileReadModel.get_by_muid(muid)
+        if profile is None:
             return CustomResponse(general_message="Invalid muid").get_failure_response()
-        roles = [
-            role.role.title for role in UserRoleLink.objects.filter(user=user)]
-        serializer = profile_serializer.UserRankSerializer(
-            user, many=False, context={"roles": roles}
-        )
-        return CustomResponse(response=serializer.data).get_success_response()
+        data = {
+            "first_name": profile["first_name"],
+            "last_name": profile["last_name"],
+            "role": profile["roles"] or ["Learner"],
+            "rank": profile["rank"],
+            "karma": profile["karma"],
+            "interest_groups": [ig["name"] for ig in profile["interest_groups"]],
+        }
+        return CustomResponse(response=data).get_success_response()
 
 
 class SocialsAPI(APIView):
@@ -123,14 +123,18 @@ class RoleAPI(APIView):
 
 class RoleManagementCSV(APIView):
     authentication_classes = [CustomizePermission]
+    export_name = "Roles"
 
     @role_required([RoleType.ADMIN.value])
     def get(self, request):
+        return CommonUtils.generate_csv(self.get_rows(), self.export_name)
+
+    @staticmethod
+    def get_rows():
         role = Role.objects.all()
-        role_serializer_data = dash_roles_serializer.RoleDashboardSerializer(
-            role, many=True
-        ).data
-        return CommonUtils.generate_csv(role_serializer_data, "Roles")
+        return CommonUtils.serialize_in_chunks(
+            role, dash_roles_serializer.RoleDashboardSerializer
+        )
 
 
 class UserRoleSearchAPI(APIView):
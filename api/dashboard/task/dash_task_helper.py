@@ -0,0 +1,151 @@
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from db.organization import Organization
+from db.task import Channel, InterestGroup, Level, TaskList, TaskType
+from utils.utils import DateTimeUtils, ImportCSV
+
+TASK_IMPORT_HEADERS = [
+    'hashtag', 'title', 'description', 'karma', 'usage_count', 'variable_karma', 'level', 'channel', 'type', 'ig',
+    'org'
+]
+
+BULK_CREATE_BATCH_SIZE = 1000
+
+# foreign keys resolved from the sheet: row column -> (model, lookup field, TaskList field)
+TASK_IMPORT_LOOKUPS = {
+    'channel': (Channel, 'name', 'channel_id'),
+    'type': (TaskType, 'title', 'type_id'),
+    'level': (Level, 'name', 'level_id'),
+    'ig': (InterestGroup, 'name', 'ig_id'),
+    'org': (Organization, 'code', 'org_id'),
+}
+
+# (column, message) checked in this order, the first failing one is reported
+TASK_IMPORT_ERRORS = (
+    ('channel', 'Invalid channel ID: {}'),
+    ('type', 'Invalid task type ID: {}'),
+    ('level', 'Invalid level ID: {}'),
+    ('ig', 'Invalid interest group ID: {}'),
+    ('org', 'Invalid organization ID: {}'),
+)
+REQUIRED_LOOKUPS = ('channel', 'type')
+
+# spellings of booleans written by spreadsheets exporting CSV
+CSV_BOOLEANS = {'true': True, 'yes': True, '1': True, 'false': False, 'no': False, '0': False}
+
+
+def _resolve_lookups(rows):
+    """
+    Maps every channel, type, level, interest group and organization named in the
+    sheet to its id with one ``IN`` query per table.
+    """
+    resolved = {}
+    for column, (model, field, _) in TASK_IMPORT_LOOKUPS.items():
+        values = {str(row[column]) for row in rows if row.get(column) is not None}
+        resolved[column] = {}
+        for obj_id, value in model.objects.filter(**{f'{field}__in': values}).values_list('id', field):
+            # several rows may share a name, the first one wins as it did with .first()
+            resolved[column].setdefault(value, obj_id)
+    return resolved
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return CSV_BOOLEANS.get(value.strip().lower(), value)
+    return value
+
+
+def _get_row_error(row, refs, resolved, hashtags):
+    hashtag = row.get('hashtag')
+    if hashtag in hashtags:
+        return f"Hashtag already exists: {hashtag}"
+
+    for column, message in TASK_IMPORT_ERRORS:
+        value = refs[column]
+        if (value is not None or column in REQUIRED_LOOKUPS) and str(value) not in resolved[column]:
+            return message.format(value)
+    return None
+
+
+def import_task_list(rows, user_id):
+    """
+    Validates the rows of a task list sheet and creates the valid ones.
+
+    Rows are read in chunks of IMPORT_CHUNK_SIZE. Lookups and hashtag checks take a
+    fixed number of queries per chunk, and tasks are inserted in batches inside one
+    transaction. Returns the created rows and the rejected rows, each with an ``error``.
+    """
+    valid_rows = []
+    error_rows = []
+    seen_hashtags = set()
+    now = DateTimeUtils.get_current_utc_time()
+
+    with transaction.atomic():
+        for chunk in ImportCSV.iter_chunks(rows):
+            resolved = _resolve_lookups(chunk)
+            hashtags = seen_hashtags | set(
+                TaskList.objects.filter(hashtag__in={row.get('hashtag') for row in chunk}).values_list(
+                    'hashtag', flat=True
+                )
+            )
+
+            tasks = []
+            for row in chunk:
+                refs = {column: row.pop(column, None) for column in TASK_IMPORT_LOOKUPS}
+                if error := _get_row_error(row, refs, resolved, hashtags):
+                    row['error'] = error
+                    error_rows.append(row)
+                    continue
+
+                task = TaskList(
+                    id=str(uuid.uuid4()),
+                    hashtag=row.get('hashtag'),
+                    title=row.get('title'),
+                    description=row.get('description'),
+                    karma=row.get('karma'),
+                    usage_count=row.get('usage_count'),
+                    variable_karma=_to_bool(row.get('variable_karma')),
+                    active=True,
+                    updated_by_id=user_id,
+                    updated_at=now,
+                    created_by_id=user_id,
+                    created_at=now,
+                    **{
+                        task_field: resolved[column].get(str(refs[column]))
+                        for column, (_, _, task_field) in TASK_IMPORT_LOOKUPS.items()
+                    },
+                )
+                try:
+                    # foreign keys were checked above, validating them again would query each one
+                    task.clean_fields(exclude=['channel', 'type', 'level', 'ig', 'org', 'updated_by', 'created_by'])
+                except ValidationError as e:
+                    row['error'] = '; '.join(
+                        f"{field}: {' '.join(messages)}" for field, messages in e.message_dict.items()
+                    )
+                    error_rows.append(row)
+                    continue
+
+                hashtags.add(task.hashtag)
+                seen_hashtags.add(task.hashtag)
+                tasks.append(task)
+                for _, _, task_field in TASK_IMPORT_LOOKUPS.values():
+                    row[task_field] = getattr(task, task_field)
+                row.update(
+                    karma=task.karma,
+                    usage_count=task.usage_count,
+                    variable_karma=task.variable_karma,
+                    id=task.id,
+                    active=True,
+                    updated_by_id=user_id,
+                    updated_at=str(now),
+                    created_by_id=user_id,
+                    created_at=str(now),
+                )
+                valid_rows.append(row)
+
+            TaskList.objects.bulk_create(tasks, batch_size=BULK_CREATE_BATCH_SIZE)
+
+    return valid_rows, error_rows
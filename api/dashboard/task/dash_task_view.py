@@ -1,5 +1,3 @@
-import uuid
-
 from django.db.models import F
 from rest_framework.views import APIView
 
@@ -10,6 +8,7 @@ from utils.permission import CustomizePermission, JWTUtils, role_required
 from utils.response import CustomResponse
 from utils.types import RoleType
 from utils.utils import CommonUtils, DateTimeUtils, ImportCSV
+from .dash_task_helper import TASK_IMPORT_HEADERS, import_task_list
 from .dash_task_serializer import TaskListSerializer, TaskUpdateSerializer, TaskCreateSerializer, \
     ChannelDropdownSerializer, IGDropdownSerializer, OrganizationDropdownSerialize, LevelDropdownSerialize, \
     TaskTypeDropdownSerializer
@@ -86,13 +85,18 @@ class TaskApi(APIView):
 
 class TaskListCSV(APIView):
     authentication_classes = [CustomizePermission]
+    export_name = 'Task List'
 
     @role_required([RoleType.ADMIN.value, ])
     def get(self, request):
-        task_serializer = TaskList.objects.all()
-        task_serializer_data = TaskListSerializer(task_serializer, many=True).data
+        return CommonUtils.generate_csv(self.get_rows(), self.export_name)
 
-        return CommonUtils.generate_csv(task_serializer_data, 'Task List')
+    @staticmethod
+    def get_rows():
+        task_serializer = TaskList.objects.select_related(
+            "created_by", "updated_by", "channel", "type", "level", "ig", "org"
+        )
+        return CommonUtils.serialize_in_chunks(task_serializer, TaskListSerializer)
 
 
 class ImportTaskListCSV(APIView):
@@ -105,73 +109,16 @@ class ImportTaskListCSV(APIView):
         except KeyError:
             return CustomResponse(general_message={'File not found.'}).get_failure_response()
 
-        excel_data = ImportCSV.read_excel_file(file_obj)
-        if not excel_data:
+        headers, rows = ImportCSV.read_rows(file_obj)
+        if not headers:
             return CustomResponse(general_message={'Empty csv file.'}).get_failure_response()
 
-        temp_headers = ['hashtag', 'title', 'description', 'karma', 'usage_count', 'variable_karma', 'level', 'channel',
-                        'type', 'ig', 'org']
-        first_entry = excel_data[0]
-        for key in temp_headers:
-            if key not in first_entry:
+        for key in TASK_IMPORT_HEADERS:
+            if key not in headers:
                 return CustomResponse(general_message={f'{key} does not exist in the file.'}).get_failure_response()
 
-        valid_rows = []
-        error_rows = []
-
-        for row in excel_data[1:]:
-            hashtag = row.get('hashtag')
-            title = row.get('title')
-            description = row.get('description')
-            karma = row.get('karma')
-            usage_count = row.get('usage_count')
-            variable_karma = row.get('variable_karma')
-            level = row.pop('level')
-            channel = row.pop('channel')
-            task_type = row.pop('type')
-            ig = row.pop('ig')
-            org = row.pop('org')
-
-            channel_obj = Channel.objects.filter(name=channel).first()
-            task_type_obj = TaskType.objects.filter(title=task_type).first()
-            level_obj = Level.objects.filter(name=level).first() if level is not None else None
-            ig_obj = InterestGroup.objects.filter(name=ig).first() if ig is not None else None
-            org_obj = Organization.objects.filter(code=org).first() if org is not None else None
-
-            if TaskList.objects.filter(hashtag=hashtag).exists():
-                row['error'] = f"Hashtag already exists: {hashtag}"
-                error_rows.append(row)
-            elif not channel_obj:
-                row['error'] = f"Invalid channel ID: {channel}"
-                error_rows.append(row)
-            elif not task_type_obj:
-                row['error'] = f"Invalid task type ID: {task_type}"
-                error_rows.append(row)
-            elif level and not level_obj:
-                row['error'] = f"Invalid level ID: {level}"
-                error_rows.append(row)
-            elif ig and not ig_obj:
-                row['error'] = f"Invalid interest group ID: {ig}"
-                error_rows.append(row)
-            elif org and not org_obj:
-                row['error'] = f"Invalid organization ID: {org}"
-                error_rows.append(row)
-            else:
-                user_id = 1
-                row['id'] = uuid.uuid4()
-                row['updated_by_id'] = user_id
-                row['updated_at'] = str(DateTimeUtils.get_current_utc_time())
-                row['created_by_id'] = user_id
-                row['created_at'] = str(DateTimeUtils.get_current_utc_time())
-                row['active'] = True
-                row['channel_id'] = channel_obj.id if channel_obj else None
-                row['type_id'] = task_type_obj.id if task_type_obj else None
-                row['level_id'] = level_obj.id if level_obj else None
-                row['ig_id'] = ig_obj.id if ig_obj else None
-                row['org_id'] = org_obj.id if ig_obj else None
-                TaskList.objects.create(**row)
-                print(row)
-                valid_rows.append(row)
+        user_id = JWTUtils.fetch_user_id(request)
+        valid_rows, error_rows = import_task_list(rows, user_id)
 
         return CustomResponse(response={"Success": valid_rows, "Failed": error_rows}).get_success_response()
 
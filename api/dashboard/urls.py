@@ -17,4 +17,5 @@ urlpatterns = [
     path('location/', include('api.dashboard.location.urls')),
     path('organisation/', include('api.dashboard.organisation.urls')),
     path('dynamic-role/', include('api.dashboard.dynamic_role.urls')),
+    path('export/', include('api.dashboard.export.urls')),
 ]
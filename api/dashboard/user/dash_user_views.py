@@ -4,7 +4,7 @@ from datetime import timedelta
 import decouple
 from django.contrib.auth.hashers import make_password
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage
 from django.db.models import Case, CharField, F, Q, Value, When
 from rest_framework.views import APIView
 
@@ -13,6 +13,7 @@ from db.task import UserLvlLink, TotalKarma
 from utils.permission import CustomizePermission, JWTUtils, role_required
 from utils.response import CustomResponse
 from utils.types import OrganizationType, RoleType, WebHookActions, WebHookCategory
+from utils.mail_outbox import MailOutbox
 from utils.utils import CommonUtils, DateTimeUtils, DiscordWebhooks, send_template_mail
 from . import dash_user_serializer
 
@@ -118,9 +119,14 @@ class UserAPI(APIView):
 
 class UserManagementCSV(APIView):
     authentication_classes = [CustomizePermission]
+    export_name = "User"
 
     @role_required([RoleType.ADMIN.value])
     def get(self, request):
+        return CommonUtils.generate_csv(self.get_rows(), self.export_name)
+
+    @staticmethod
+    def get_rows():
         user_queryset = User.objects.annotate(
             total_karma=Case(
                 When(total_karma_user__isnull=False, then=F("total_karma_user__karma")),
@@ -161,10 +167,9 @@ class UserManagementCSV(APIView):
                 output_field=CharField(),
             ),
         )
-        user_serializer_data = dash_user_serializer.UserDashboardSerializer(
-            user_queryset, many=True
-        ).data
-        return CommonUtils.generate_csv(user_serializer_data, "User")
+        return CommonUtils.serialize_in_chunks(
+            user_queryset, dash_user_serializer.UserDashboardSerializer
+        )
 
 
 class UserVerificationAPI(APIView):
@@ -330,12 +335,8 @@ class UserInviteAPI(APIView):
         from_mail = decouple.config("FROM_MAIL")
         to = [email]
         message = f"Hi, \n\nYou have been invited to join the MuLearn community. Please click on the link below to join.\n\n{domain}\n\nThanks,\nMuLearn Team"
-        send_mail(
-            "Invitation to join MuLearn",
-            message,
-            from_mail,
-            to,
-            fail_silently=False,
+        MailOutbox.enqueue(
+            EmailMessage("Invitation to join MuLearn", message, from_mail, to)
         )
         return CustomResponse(
             general_message="Invitation sent successfully"
@@ -1,12 +1,10 @@
-from datetime import timedelta
-
-from django.db.models import Sum, Count, Q, Case, When, IntegerField
 from rest_framework import serializers
 
 from db.organization import UserOrganizationLink, District, Organization
-from db.task import KarmaActivityLog, Level
+from db.task import Level
 from db.user import User
-from utils.utils import DateTimeUtils
+from utils import karma_rollup
+from utils.karma_rollup import OrgKarmaRollup
 
 
 class ZonalDetailsSerializer(serializers.ModelSerializer):
@@ -29,49 +27,16 @@ class ZonalDetailsSerializer(serializers.ModelSerializer):
         ]
 
     def get_rank(self, obj):
-        org_karma_dict = (
-            UserOrganizationLink.objects.all()
-            .values("org__district__zone")
-            .annotate(total_karma=Sum("user__total_karma_user__karma"))
-        )
-
-        rank_dict = {
-            data["org__district__zone"]: data["total_karma"]
-            if data["total_karma"] is not None
-            else 0
-            for data in org_karma_dict
-        }
-
-        sorted_rank_dict = dict(
-            sorted(rank_dict.items(), key=lambda x: x[1], reverse=True)
-        )
-
-        if obj.org.district.zone.id in sorted_rank_dict:
-            keys_list = list(sorted_rank_dict.keys())
-            position = keys_list.index(obj.org.district.zone.id)
-            return position + 1
+        return OrgKarmaRollup.get(karma_rollup.ZONE, obj.org.district.zone_id)["rank"]
 
     def get_karma(self, obj):
-        return UserOrganizationLink.objects.filter(
-            org__district__zone=obj.org.district.zone,
-        ).aggregate(total_karma=Sum("user__total_karma_user__karma"))["total_karma"]
+        return OrgKarmaRollup.get(karma_rollup.ZONE, obj.org.district.zone_id)["karma"]
 
     def get_total_members(self, obj):
-        return UserOrganizationLink.objects.filter(
-            org__district__zone=obj.org.district.zone,
-        ).count()
+        return OrgKarmaRollup.get(karma_rollup.ZONE, obj.org.district.zone_id)["members"]
 
     def get_active_members(self, obj):
-        today = DateTimeUtils.get_current_utc_time()
-        start_date = today.replace(day=1)
-        end_date = start_date.replace(
-            day=1, month=(start_date.month % 12) + 1
-        ) - timedelta(days=1)
-
-        return KarmaActivityLog.objects.filter(
-            user__user_organization_link_user__org__district__zone=obj.org.district.zone,
-            created_at__range=(start_date, end_date),
-        ).count()
+        return OrgKarmaRollup.get(karma_rollup.ZONE, obj.org.district.zone_id)["monthly_activity"]
 
 
 class ZonalTopThreeDistrictSerializer(serializers.ModelSerializer):
@@ -1,11 +1,11 @@
-from itertools import islice
-
-from django.db.models import Case, CharField, F, Sum, When
+from django.db.models import Case, CharField, F, When
 from rest_framework.views import APIView
 
-from db.organization import District, Organization, UserOrganizationLink
+from db.organization import District, Organization
 from db.task import Level, TotalKarma
 from db.user import User
+from utils import karma_rollup
+from utils.karma_rollup import OrgKarmaRollup
 from utils.permission import CustomizePermission, JWTUtils, role_required
 from utils.response import CustomResponse
 from utils.types import OrganizationType, RoleType
@@ -38,32 +38,16 @@ class ZonalTopThreeDistrictAPI(APIView):
 
         user_org_link = dash_zonal_helper.get_user_college_link(user_id)
 
-        district_karma_dict = (
-            UserOrganizationLink.objects.filter(
-                org__district__zone=user_org_link.org.district.zone,
-                verified=True,
-            )
-            .values("org__district")
-            .annotate(total_karma=Sum("user__total_karma_user__karma"))
-        )
-
-        district_ranks = {
-            data["org__district"]: data["total_karma"]
-            if data["total_karma"] is not None
-            else 0
-            for data in district_karma_dict
-        }
-
-        district_ranks = dict(
-            sorted(district_ranks.items(), key=lambda x: x[1], reverse=True)
+        top_districts = dict(
+            OrgKarmaRollup.get_top(karma_rollup.DISTRICT, user_org_link.org.district.zone_id)
         )
 
-        top_districts = dict(islice(district_ranks.items(), 3))
-
-        org_user_district = District.objects.filter(id__in=top_districts).distinct()
+        org_user_district = District.objects.in_bulk(list(top_districts))
 
         serializer = dash_zonal_serializer.ZonalTopThreeDistrictSerializer(
-            org_user_district, many=True, context={"ranks": district_ranks}
+            [org_user_district[district_id] for district_id in top_districts if district_id in org_user_district],
+            many=True,
+            context={"ranks": top_districts},
         )
 
         return CustomResponse(response=serializer.data).get_success_response()
@@ -189,10 +173,10 @@ class ZonalStudentDetailsCSVAPI(APIView):
             )
         )
 
-        serializer = dash_zonal_serializer.ZonalStudentDetailsSerializer(
-            user_org_links, many=True, context={"ranks": ranks}
+        rows = CommonUtils.serialize_in_chunks(
+            user_org_links, dash_zonal_serializer.ZonalStudentDetailsSerializer, context={"ranks": ranks}
         )
-        return CommonUtils.generate_csv(serializer.data, "Zonal Student Details")
+        return CommonUtils.generate_csv(rows, "Zonal Student Details")
 
 
 class ZonalCollegeDetailsAPI(APIView):
@@ -298,7 +282,7 @@ class ZonalCollegeDetailsCSVAPI(APIView):
             )
         )
 
-        serializer = dash_zonal_serializer.ZonalCollegeDetailsSerializer(
-            organizations, many=True, context={"leads": leads}
+        rows = CommonUtils.serialize_in_chunks(
+            organizations, dash_zonal_serializer.ZonalCollegeDetailsSerializer, context={"leads": leads}
         )
-        return CommonUtils.generate_csv(serializer.data, "Zonal College Details")
+        return CommonUtils.generate_csv(rows, "Zonal College Details")
@@ -0,0 +1,57 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from db.hackathon import Hackathon, HackathonOrganiserLink, HackathonUserSubmission
+from utils.cache import invalidate_on_commit
+from .serializer import HackathonRetrievalSerializer
+
+# renamed organisations or districts skip the signals below
+PUBLISHED_TIMEOUT = 60 * 10
+
+
+class PublishedHackathons:
+    """
+    Published hackathons as HackathonRetrievalSerializer renders them, kept in the
+    shared cache and dropped whenever a hackathon is created, updated, published or
+    deleted. The cached rows are the same for every viewer; ``editable`` and
+    ``is_applied`` are filled in per request from the viewer's id sets.
+    """
+
+    KEY = "hackathon:published"
+
+    @classmethod
+    def get(cls) -> list[dict]:
+        if (rows := cache.get(cls.KEY)) is None:
+            hackathons = Hackathon.objects.filter(status="Published").select_related("org", "district")
+            rows = [
+                dict(row)
+                for row in HackathonRetrievalSerializer(
+                    hackathons, many=True, context={"organised_ids": set(), "applied_ids": set()}
+                ).data
+            ]
+            cache.set(cls.KEY, rows, PUBLISHED_TIMEOUT)
+        return rows
+
+    @classmethod
+    def invalidate(cls):
+        cache.delete(cls.KEY)
+
+
+def get_user_hackathon_ids(user_id) -> tuple[set, set]:
+    """
+    Returns the ids of the hackathons the user organises and of those they applied to.
+    """
+    organised_ids = set(
+        HackathonOrganiserLink.objects.filter(organiser_id=user_id).values_list("hackathon_id", flat=True)
+    )
+    applied_ids = set(
+        HackathonUserSubmission.objects.filter(user_id=user_id).values_list("hackathon_id", flat=True)
+    )
+    return organised_ids, applied_ids
+
+
+@receiver(post_save, sender=Hackathon)
+@receiver(post_delete, sender=Hackathon)
+def hackathon_changed(sender, instance, **kwargs):
+    invalidate_on_commit(PublishedHackathons.invalidate)
@@ -1,6 +1,5 @@
 from datetime import datetime
 
-from django.db.models import Q
 from rest_framework.views import APIView
 
 from db.hackathon import (
@@ -13,6 +12,7 @@ from db.organization import District, Organization
 from utils.permission import CustomizePermission, JWTUtils, role_required
 from utils.response import CustomResponse
 from utils.types import DEFAULT_HACKATHON_FORM_FIELDS, RoleType
+from .hackathon_helper import PublishedHackathons, get_user_hackathon_ids
 from .serializer import HackathonRetrievalSerializer, UpcomingHackathonRetrievalSerializer, \
     HackathonCreateUpdateDeleteSerializer, HackathonUpdateSerializer, HackathonPublishingSerializer, \
     HackathonInfoSerializer, HackathonUserSubmissionSerializer, ListApplicantsSerializer, \
@@ -44,10 +44,25 @@ class HackathonManagementAPI(APIView):
                 hackathons_queryset
             )
         else:
-            hackathons_queryset = Hackathon.objects.filter(
-                Q(status="Published") | Q(hackathonorganiserlink__organiser_id=user_id)).distinct()
-
-            serializer = HackathonRetrievalSerializer(hackathons_queryset, many=True, context={"user_id": user_id})
+            organised_ids, applied_ids = get_user_hackathon_ids(user_id)
+            context = {"organised_ids": organised_ids, "applied_ids": applied_ids}
+            # the viewer's own drafts are not in the shared list
+            drafts = HackathonRetrievalSerializer(
+                Hackathon.objects.filter(id__in=organised_ids)
+                .exclude(status="Published")
+                .select_related("org", "district"),
+                many=True,
+                context=context,
+            ).data
+
+            hackathons = [
+                hackathon | {
+                    "editable": hackathon["id"] in organised_ids,
+                    "is_applied": hackathon["id"] in applied_ids,
+                }
+                for hackathon in PublishedHackathons.get()
+            ]
+            return CustomResponse(response=hackathons + drafts).get_success_response()
 
         return CustomResponse(response=serializer.data).get_success_response()
 
@@ -57,10 +57,14 @@ class HackathonRetrievalSerializer(serializers.ModelSerializer):
         return f"{settings.MEDIA_URL}{media}" if (media := obj.event_logo) else None
 
     def get_editable(self, obj):
+        if (organised_ids := self.context.get("organised_ids")) is not None:
+            return obj.id in organised_ids
         user_id = self.context.get("user_id")
         return HackathonOrganiserLink.objects.filter(organiser=user_id, hackathon=obj).exists()
 
     def get_is_applied(self, obj):
+        if (applied_ids := self.context.get("applied_ids")) is not None:
+            return obj.id in applied_ids
         user_id = self.context.get("user_id")
         return HackathonUserSubmission.objects.filter(user=user_id, hackathon=obj).exists()
 
@@ -1,12 +1,20 @@
+import hmac
+import threading
+import time
+import uuid
+from collections import Counter
 from datetime import datetime, timedelta
 
-import decouple
 import jwt
 import pytz
-import requests
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 from db.integrations import Integration
+from mulearnbackend.metrics import MetricsRegistry
 from mulearnbackend.settings import SECRET_KEY
+from utils.http_client import AUTH, KKEM, HttpClient
 from utils.response import CustomResponse
 
 
@@ -52,6 +60,74 @@ def generate_confirmation_token(authorization_id: str) -> str:
     return jwt.encode(payload, SECRET_KEY, algorithm="HS256")
 
 
+class IntegrationTokenCache:
+    """
+    Tokens of each integration, kept in the memory of every worker for TIMEOUT seconds.
+
+    Tokens never leave the process; workers only share a version through the cache,
+    which is replaced whenever an integration is saved or deleted, so a rotated token
+    stops working everywhere on the next request. Tokens changed directly in the
+    database are picked up within TIMEOUT.
+
+    Requests are counted per integration and result for capacity planning.
+    """
+
+    VERSION_KEY = "integration_token:version"
+    TIMEOUT = 60 * 5
+
+    _version = None
+    _tokens = {}
+    _lock = threading.Lock()
+
+    request_counts = Counter()
+
+    @classmethod
+    def get_tokens(cls, integration_name) -> tuple:
+        if (version := cache.get(cls.VERSION_KEY)) is None:
+            cache.add(cls.VERSION_KEY, uuid.uuid4().hex, None)
+            version = cache.get(cls.VERSION_KEY)
+        if version != cls._version:
+            cls._version, cls._tokens = version, {}
+
+        tokens, expires_at = cls._tokens.get(integration_name, (None, 0))
+        if tokens is None or expires_at < time.monotonic():
+            tokens = tuple(
+                Integration.objects.filter(name=integration_name).values_list("token", flat=True)
+            )
+            cls._tokens[integration_name] = (tokens, time.monotonic() + cls.TIMEOUT)
+        return tokens
+
+    @classmethod
+    def is_valid(cls, integration_name, token) -> bool:
+        valid = False
+        for known_token in cls.get_tokens(integration_name):
+            # every token is compared in full so the time taken gives nothing away
+            valid |= hmac.compare_digest(known_token.encode(), token.encode())
+
+        with cls._lock:
+            cls.request_counts[integration_name, "accepted" if valid else "rejected"] += 1
+        return valid
+
+    @classmethod
+    def invalidate(cls):
+        cache.set(cls.VERSION_KEY, uuid.uuid4().hex, None)
+
+
+MetricsRegistry.register_gauge(
+    "mulearn_integration_requests_total",
+    "Requests made by integrations with their tokens.",
+    lambda: dict(IntegrationTokenCache.request_counts),
+    kind="counter",
+    labels=("integration", "result"),
+)
+
+
+@receiver(post_save, sender=Integration)
+@receiver(post_delete, sender=Integration)
+def integration_changed(sender, instance, **kwargs):
+    IntegrationTokenCache.invalidate()
+
+
 def token_required(integration_name: str):
     """
     The `token_required` function is a decorator that checks if a valid token is present in the
@@ -72,9 +148,7 @@ def token_required(integration_name: str):
 
                 token = auth_header.split(" ")[1]
 
-                if not Integration.objects.filter(
-                        token=token, name=integration_name
-                ).first():
+                if not IntegrationTokenCache.is_valid(integration_name, token):
                     raise ValueError("Invalid Authorization header")
                 else:
                     result = func(self, request, *args, **kwargs)
@@ -102,17 +176,15 @@ def get_access_token(
     :return: a dictionary with two keys: "accessToken" and "refreshToken".
     """
 
-    auth_domain = decouple.config("AUTH_DOMAIN")
+    client = HttpClient.get(AUTH)
 
     if password or email_or_muid:
-        response = requests.post(
-            f"{auth_domain}/api/v1/auth/user-authentication/",
+        response = client.post(
+            "/api/v1/auth/user-authentication/",
             data={"emailOrMuid": email_or_muid, "password": password},
         )
     else:
-        response = requests.post(
-            f"{auth_domain}/api/v1/auth/token-verification/{token}/",
-        )
+        response = client.post(f"/api/v1/auth/token-verification/{token}/")
 
     response = response.json()
     if response.get("statusCode") != 200:
@@ -126,3 +198,15 @@ def get_access_token(
         "accessToken": access_token,
         "refreshToken": refresh_token,
     }
+
+
+def fetch_kkem_jobseeker(jsid, token: str) -> dict:
+    """
+    Asks KKEM for the details of a job seeker and returns its JSON answer.
+    """
+    response = HttpClient.get(KKEM).post(
+        "/api/jobseeker-details",
+        data=f'{{"job_seeker_id": {jsid}}}',
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    return response.json()
@@ -0,0 +1,111 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+
+from django.db.models import Q
+
+from db.integrations import IntegrationAuthorization
+from db.task import KarmaActivityLog, TotalKarma, UserIgLink
+from db.user import User
+from utils.karma_rollup import fetch_ig_karma
+from utils.types import IntegrationType
+from utils.utils import DateTimeUtils
+
+FEED_PAGE_SIZE = 500
+FEED_MAX_PAGE_SIZE = 1000
+# users serialized per round of queries while the page streams
+FEED_BATCH_SIZE = 100
+# karma logs younger than this are left for the next poll, so rows committed late with
+# a slightly older updated_at are not skipped by the watermark
+FEED_SETTLE_TIME = timedelta(seconds=10)
+
+
+def encode_watermark(updated_at: datetime, log_id: str) -> str:
+    data = json.dumps([updated_at.isoformat(), log_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_watermark(watermark: str) -> tuple[datetime, str]:
+    """
+    Returns the ``(updated_at, id)`` of the last karma log a watermark covers, or raises
+    ValueError for a watermark this feed did not hand out.
+    """
+    try:
+        updated_at, log_id = json.loads(base64.urlsafe_b64decode(watermark.encode()))
+        return datetime.fromisoformat(updated_at), str(log_id)
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def get_changed_users(watermark=None, from_datetime=None, limit=FEED_PAGE_SIZE):
+    """
+    Reads the next ``limit`` approved karma logs of verified KKEM users after the
+    watermark, in (updated_at, id) order, which the karma_log_updated_at_idx index
+    (db/sql/karma_log_updated_at_idx.sql) serves without scanning the table.
+
+    Returns the ids of the users they belong to, in order of first change, the next
+    watermark and whether more changes are waiting.
+    """
+    logs = KarmaActivityLog.objects.filter(
+        appraiser_approved=True,
+        user__integration_authorization_user__integration__name=IntegrationType.KKEM.value,
+        user__integration_authorization_user__verified=True,
+        updated_at__lte=DateTimeUtils.get_current_utc_time() - FEED_SETTLE_TIME,
+    )
+    if watermark:
+        updated_at, log_id = decode_watermark(watermark)
+        logs = logs.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=log_id))
+    elif from_datetime:
+        logs = logs.filter(updated_at__gte=from_datetime)
+
+    page = list(logs.order_by("updated_at", "id").values_list("updated_at", "id", "user_id")[: limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    if page:
+        watermark = encode_watermark(page[-1][0], page[-1][1])
+    user_ids = list(dict.fromkeys(user_id for _, _, user_id in page))
+    return user_ids, watermark, has_more
+
+
+def get_kkem_users(user_ids) -> list[dict]:
+    """
+    Builds what KKEMUserSerializer returns for each user, with five queries for the
+    whole batch instead of several per user and interest group.
+    """
+    mu_ids = dict(User.objects.filter(id__in=user_ids).values_list("id", "mu_id"))
+    jsids = dict(
+        IntegrationAuthorization.objects.filter(user_id__in=user_ids, verified=True).values_list(
+            "user_id", "integration_value"
+        )
+    )
+    karma = dict(TotalKarma.objects.filter(user_id__in=user_ids).values_list("user_id", "karma"))
+
+    interest_groups = {}
+    for user_id, ig_id, ig_name in UserIgLink.objects.filter(user_id__in=user_ids).values_list(
+        "user_id", "ig_id", "ig__name"
+    ):
+        interest_groups.setdefault(user_id, []).append((ig_id, ig_name))
+
+    ig_karma = fetch_ig_karma(user_ids, approved_only=False)
+
+    return [
+        {
+            "mu_id": mu_ids[user_id],
+            "jsid": jsids.get(user_id),
+            "total_karma": karma.get(user_id) or 0,
+            "interest_groups": [
+                {"name": ig_name, "karma": ig_karma.get((user_id, ig_id)) or 0}
+                for ig_id, ig_name in interest_groups.get(user_id, ())
+            ],
+        }
+        for user_id in user_ids
+        if user_id in mu_ids
+    ]
+
+
+def iter_kkem_users_ndjson(user_ids):
+    for start in range(0, len(user_ids), FEED_BATCH_SIZE):
+        for user in get_kkem_users(user_ids[start : start + FEED_BATCH_SIZE]):
+            yield json.dumps(user, default=str) + "\n"
@@ -1,9 +1,9 @@
 from django.db.models import Q
 from django.db.models import Sum
 from django.db.utils import IntegrityError
-import requests
 from rest_framework import serializers
 
+from api.integrations.integrations_helper import fetch_kkem_jobseeker
 from db.integrations import IntegrationAuthorization, Integration
 from db.task import KarmaActivityLog, UserIgLink
 from db.user import User
@@ -72,12 +72,9 @@ class KKEMAuthorization(serializers.ModelSerializer):
         integration = Integration.objects.get(name=IntegrationType.KKEM.value)
 
         try:
-            response = requests.post(
-                url="https://stagging.knowledgemission.kerala.gov.in/MuLearn/api/jobseeker-details",
-                data=f'{{"job_seeker_id": {validated_data["integration_value"]}}}',
-                headers={"Authorization": f"Bearer {integration.token}"},
+            response_data = fetch_kkem_jobseeker(
+                validated_data["integration_value"], integration.token
             )
-            response_data = response.json()
 
             if (
                 "response" not in response_data
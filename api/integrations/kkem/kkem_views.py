@@ -2,7 +2,7 @@ from datetime import datetime
 
 
 from django.db.models import Prefetch
-import requests
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 
 from db.integrations import Integration, IntegrationAuthorization
@@ -13,6 +13,7 @@ from utils.utils import DateTimeUtils, send_template_mail
 from utils.types import IntegrationType
 
 from .. import integrations_helper
+from . import kkem_helper
 from .kkem_serializer import KKEMAuthorization, KKEMUserSerializer
 
 
@@ -65,6 +66,46 @@ class KKEMBulkKarmaAPI(APIView):
         return CustomResponse(response=serialized_users.data).get_success_response()
 
 
+class KKEMKarmaFeedAPI(APIView):
+    """
+    Change feed of KKEM users whose karma changed, streamed as NDJSON with one user per
+    line. Pass the X-Next-Cursor header of a response as ``cursor`` to get the changes
+    after it; X-Has-More tells whether to ask again right away.
+    """
+
+    @integrations_helper.token_required(IntegrationType.KKEM.value)
+    def get(self, request):
+        from_datetime = None
+        if from_datetime_str := request.GET.get("from_datetime"):
+            try:
+                from_datetime = datetime.strptime(
+                    from_datetime_str, "%Y-%m-%dT%H:%M:%S"
+                )
+            except ValueError:
+                return CustomResponse(
+                    general_message="Invalid datetime format",
+                ).get_failure_response()
+
+        try:
+            limit = min(
+                max(int(request.GET.get("limit", kkem_helper.FEED_PAGE_SIZE)), 1),
+                kkem_helper.FEED_MAX_PAGE_SIZE,
+            )
+            user_ids, cursor, has_more = kkem_helper.get_changed_users(
+                request.GET.get("cursor"), from_datetime, limit
+            )
+        except ValueError as e:
+            return CustomResponse(general_message=str(e)).get_failure_response()
+
+        response = StreamingHttpResponse(
+            kkem_helper.iter_kkem_users_ndjson(user_ids),
+            content_type="application/x-ndjson",
+        )
+        response["X-Next-Cursor"] = cursor or ""
+        response["X-Has-More"] = str(has_more).lower()
+        return response
+
+
 class KKEMIndividualKarmaAPI(APIView):
     @integrations_helper.token_required(IntegrationType.KKEM.value)
     def get(self, request, mu_id):
@@ -173,12 +214,7 @@ class KKEMdetailsFetchAPI(APIView):
         try:
             token = Integration.objects.get(name=IntegrationType.KKEM.value).token
 
-            response = requests.post(
-                url="https://stagging.knowledgemission.kerala.gov.in/MuLearn/api/jobseeker-details",
-                data=f'{{"job_seeker_id": {jsid}}}',
-                headers={"Authorization": f"Bearer {token}"},
-            )
-            response_data = response.json()
+            response_data = integrations_helper.fetch_kkem_jobseeker(jsid, token)
 
             if (
                 "request_status" in response_data
@@ -9,5 +9,6 @@ urlpatterns = [
     path('user/<str:jsid>/', kkem_views.KKEMdetailsFetchAPI.as_view(), name="get-details"),
     path('authorization/<str:token>/', kkem_views.KKEMAuthorizationAPI.as_view(), name="verify-auth"),
     path('users/', kkem_views.KKEMBulkKarmaAPI.as_view(), name="list-user"),
+    path('users/changes/', kkem_views.KKEMKarmaFeedAPI.as_view(), name="user-changes"),
     path('users/<str:mu_id>/', kkem_views.KKEMIndividualKarmaAPI.as_view(), name="get-user"),
 ]
@@ -0,0 +1,378 @@
+import heapq
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from db.organization import Organization, UserOrganizationLink
+from db.task import KarmaActivityLog, TotalKarma
+from db.user import UserRoleLink
+from utils.cache import invalidate_on_commit
+from utils.types import OrganizationType, RoleType
+from utils.utils import DateTimeUtils
+
+LEADERBOARD_SIZE = 20
+LEADERBOARD_TIMEOUT = 60 * 10
+PATCH_LOCK_TIMEOUT = 10
+
+
+def get_fullname(first_name, last_name):
+    return first_name if last_name is None else f"{first_name} {last_name}"
+
+
+class KarmaLeaderboard:
+    """
+    Ranked karma snapshots backing the public leaderboards.
+
+    Every scope keeps its top entries in the cache, so serving a board is a single
+    cache read. College scopes additionally keep the running total of every college
+    under a separate key, which lets a karma write patch only the colleges it touches.
+    Karma writes made through this service update the snapshots in place once they
+    commit; writes made by other services (the Discord bot) are picked up when a
+    snapshot expires.
+    """
+
+    STUDENTS = "leaderboard:students"
+    COLLEGE = "leaderboard:college"
+
+    @staticmethod
+    def _monthly_key(scope):
+        start_date, _ = DateTimeUtils.get_current_month_range()
+        return f"{scope}-monthly:{start_date:%Y-%m}"
+
+    @staticmethod
+    def _rank(totals: dict) -> list:
+        return heapq.nlargest(LEADERBOARD_SIZE, totals.items(), key=lambda x: x[1])
+
+    @staticmethod
+    def _patch(keys, update, *args):
+        """
+        Runs ``update`` on the board stored under ``keys`` while holding a short lock
+        on it. Every worker shares the boards, so a worker finding the lock held drops
+        the board instead, to be rebuilt on the next read, rather than lose an update.
+        """
+        lock, stale = f"{keys[0]}:lock", f"{keys[0]}:stale"
+        if not cache.add(lock, True, PATCH_LOCK_TIMEOUT):
+            cache.set(stale, True, PATCH_LOCK_TIMEOUT)
+            cache.delete_many(keys)
+            return
+        try:
+            update(*args)
+        finally:
+            # the holder may have written the board back after it was dropped
+            if cache.get(stale):
+                cache.delete_many([*keys, stale])
+            cache.delete(lock)
+
+    @classmethod
+    def invalidate(cls):
+        cache.delete_many(
+            [
+                cls.STUDENTS,
+                cls.COLLEGE,
+                f"{cls.COLLEGE}:totals",
+                cls._monthly_key(cls.STUDENTS),
+                cls._monthly_key(cls.COLLEGE),
+                f"{cls._monthly_key(cls.COLLEGE)}:totals",
+            ]
+        )
+
+    # Students
+
+    @classmethod
+    def students(cls) -> list:
+        if (board := cache.get(cls.STUDENTS)) is None:
+            board = cls._build_students()
+        return board["rows"]
+
+    @classmethod
+    def _build_students(cls) -> dict:
+        users = list(
+            TotalKarma.objects.filter(
+                user__user_organization_link_user__org__org_type=OrganizationType.COLLEGE.value
+            )
+            .values("user_id", "karma", first_name=F("user__first_name"), last_name=F("user__last_name"))
+            .distinct()
+            .order_by("-karma")[:LEADERBOARD_SIZE]
+        )
+        institutions = cls._get_institutions([user["user_id"] for user in users])
+
+        board = {
+            "ids": [user["user_id"] for user in users],
+            "rows": [
+                {
+                    "full_name": get_fullname(user["first_name"], user["last_name"]),
+                    "total_karma": user["karma"],
+                    "institution": institutions.get(user["user_id"]),
+                }
+                for user in users
+            ],
+        }
+        cache.set(cls.STUDENTS, board, LEADERBOARD_TIMEOUT)
+        return board
+
+    @staticmethod
+    def _get_institutions(user_ids: list) -> dict:
+        institutions = {}
+        for link in (
+            UserOrganizationLink.objects.filter(user_id__in=user_ids)
+            .order_by("id")
+            .values("user_id", "org__code")
+        ):
+            institutions.setdefault(link["user_id"], link["org__code"])
+        return institutions
+
+    @classmethod
+    def _update_students(cls, user_id, karma):
+        if (board := cache.get(cls.STUDENTS)) is None:
+            return
+
+        ids, rows = board["ids"], board["rows"]
+        is_full = len(rows) >= LEADERBOARD_SIZE
+
+        if user_id in ids:
+            row = rows[ids.index(user_id)]
+            if is_full and karma < row["total_karma"]:
+                # someone outside the board may now outrank this user
+                cache.delete(cls.STUDENTS)
+                return
+            row["total_karma"] = karma
+
+        elif not is_full or karma > rows[-1]["total_karma"]:
+            user = (
+                UserOrganizationLink.objects.filter(
+                    user_id=user_id, org__org_type=OrganizationType.COLLEGE.value
+                )
+                .values(first_name=F("user__first_name"), last_name=F("user__last_name"))
+                .first()
+            )
+            if user is None:
+                return
+
+            ids.append(user_id)
+            rows.append(
+                {
+                    "full_name": get_fullname(user["first_name"], user["last_name"]),
+                    "total_karma": karma,
+                    "institution": cls._get_institutions([user_id]).get(user_id),
+                }
+            )
+        else:
+            return
+
+        ranked = sorted(zip(ids, rows), key=lambda x: x[1]["total_karma"], reverse=True)
+        ranked = ranked[:LEADERBOARD_SIZE]
+        board = {"ids": [i for i, _ in ranked], "rows": [row for _, row in ranked]}
+        cache.set(cls.STUDENTS, board, LEADERBOARD_TIMEOUT)
+
+    # Students, current month
+
+    @classmethod
+    def students_monthly(cls) -> list:
+        if (rows := cache.get(cls._monthly_key(cls.STUDENTS))) is None:
+            rows = cls._build_students_monthly()
+        return rows
+
+    @classmethod
+    def _build_students_monthly(cls) -> list:
+        start_date, end_date = DateTimeUtils.get_current_month_range()
+        students = (
+            UserRoleLink.objects.filter(role__title=RoleType.STUDENT.value)
+            .values("user_id", "user__first_name", "user__last_name")
+            .annotate(
+                total_karma=Sum(
+                    "user__karma_activity_log_user__karma",
+                    filter=Q(
+                        user__karma_activity_log_user__created_at__gte=start_date,
+                        user__karma_activity_log_user__created_at__lt=end_date,
+                    ),
+                )
+            )
+            .order_by(F("total_karma").desc(nulls_last=True))[:LEADERBOARD_SIZE]
+        )
+
+        rows = [
+            {
+                "id": student["user_id"],
+                "full_name": get_fullname(student["user__first_name"], student["user__last_name"]),
+                "total_karma": student["total_karma"],
+            }
+            for student in students
+        ]
+        cache.set(cls._monthly_key(cls.STUDENTS), rows, LEADERBOARD_TIMEOUT)
+        return rows
+
+    @classmethod
+    def _update_students_monthly(cls, user_id, karma):
+        key = cls._monthly_key(cls.STUDENTS)
+        if (rows := cache.get(key)) is None:
+            return
+
+        is_full = len(rows) >= LEADERBOARD_SIZE
+        lowest = (rows[-1]["total_karma"] or 0) if rows else 0
+
+        if row := next((row for row in rows if row["id"] == user_id), None):
+            if is_full and karma < 0:
+                cache.delete(key)
+                return
+            row["total_karma"] = (row["total_karma"] or 0) + karma
+
+        else:
+            start_date, end_date = DateTimeUtils.get_current_month_range()
+            total_karma = KarmaActivityLog.objects.filter(
+                user_id=user_id, created_at__gte=start_date, created_at__lt=end_date
+            ).aggregate(total_karma=Sum("karma"))["total_karma"]
+
+            if is_full and (total_karma or 0) <= lowest:
+                return
+
+            student = (
+                UserRoleLink.objects.filter(user_id=user_id, role__title=RoleType.STUDENT.value)
+                .values("user__first_name", "user__last_name")
+                .first()
+            )
+            if student is None:
+                return
+
+            rows.append(
+                {
+                    "id": user_id,
+                    "full_name": get_fullname(student["user__first_name"], student["user__last_name"]),
+                    "total_karma": total_karma,
+                }
+            )
+
+        rows.sort(key=lambda x: x["total_karma"] or 0, reverse=True)
+        cache.set(key, rows[:LEADERBOARD_SIZE], LEADERBOARD_TIMEOUT)
+
+    # Colleges
+
+    @classmethod
+    def college(cls) -> list:
+        if (rows := cache.get(cls.COLLEGE)) is None:
+            rows = cls._build_college(cls.COLLEGE, "user_organization_link_org__user__total_karma_user__karma")
+        return rows
+
+    @classmethod
+    def college_monthly(cls) -> list:
+        key = cls._monthly_key(cls.COLLEGE)
+        if (rows := cache.get(key)) is None:
+            start_date, end_date = DateTimeUtils.get_current_month_range()
+            rows = cls._build_college(
+                key,
+                "user_organization_link_org__user__karma_activity_log_user__karma",
+                Q(
+                    user_organization_link_org__user__karma_activity_log_user__created_at__gte=start_date,
+                    user_organization_link_org__user__karma_activity_log_user__created_at__lt=end_date,
+                ),
+            )
+        return rows
+
+    @classmethod
+    def _build_college(cls, key, karma_field, karma_filter=None) -> list:
+        organizations = (
+            Organization.objects.filter(org_type=OrganizationType.COLLEGE.value)
+            .values("id", "code", "title")
+            .annotate(total_karma=Sum(karma_field, filter=karma_filter))
+        )
+
+        state = {"totals": {}, "orgs": {}}
+        for org in organizations:
+            state["totals"][org["id"]] = org["total_karma"] or 0
+            state["orgs"][org["id"]] = (org["code"], org["title"])
+
+        return cls._save_college(key, state)
+
+    @classmethod
+    def _save_college(cls, key, state) -> list:
+        rows = [
+            {
+                "code": state["orgs"][org_id][0],
+                "institution": state["orgs"][org_id][1],
+                "total_karma": total_karma,
+            }
+            for org_id, total_karma in cls._rank(state["totals"])
+        ]
+        cache.set_many({key: rows, f"{key}:totals": state}, LEADERBOARD_TIMEOUT)
+        return rows
+
+    @classmethod
+    def _update_college(cls, key, user_id, apply):
+        if (state := cache.get(f"{key}:totals")) is None:
+            cache.delete(key)
+            return
+
+        org_ids = UserOrganizationLink.objects.filter(
+            user_id=user_id, org__org_type=OrganizationType.COLLEGE.value
+        ).values_list("org_id", flat=True)
+
+        if changed := [org_id for org_id in org_ids if org_id in state["totals"]]:
+            apply(state["totals"], changed)
+            cls._save_college(key, state)
+
+    @classmethod
+    def _update_college_total(cls, user_id):
+        def apply(totals, org_ids):
+            organizations = (
+                Organization.objects.filter(id__in=org_ids)
+                .values("id")
+                .annotate(total_karma=Sum("user_organization_link_org__user__total_karma_user__karma"))
+            )
+            for org in organizations:
+                totals[org["id"]] = org["total_karma"] or 0
+
+        cls._update_college(cls.COLLEGE, user_id, apply)
+
+    @classmethod
+    def _update_college_monthly(cls, user_id, karma):
+        def apply(totals, org_ids):
+            for org_id in org_ids:
+                totals[org_id] += karma
+
+        cls._update_college(cls._monthly_key(cls.COLLEGE), user_id, apply)
+
+    # Karma write hooks
+
+    @classmethod
+    def total_karma_changed(cls, user_id, karma):
+        cls._patch([cls.STUDENTS], cls._update_students, user_id, karma)
+        cls._patch([cls.COLLEGE, f"{cls.COLLEGE}:totals"], cls._update_college_total, user_id)
+
+    @classmethod
+    def karma_logged(cls, user_id, karma):
+        cls._patch([cls._monthly_key(cls.STUDENTS)], cls._update_students_monthly, user_id, karma)
+        key = cls._monthly_key(cls.COLLEGE)
+        cls._patch([key, f"{key}:totals"], cls._update_college_monthly, user_id, karma)
+
+    @classmethod
+    def invalidate_monthly(cls):
+        key = cls._monthly_key(cls.COLLEGE)
+        cache.delete_many([cls._monthly_key(cls.STUDENTS), key, f"{key}:totals"])
+
+
+@receiver(post_save, sender=TotalKarma)
+def total_karma_saved(sender, instance, **kwargs):
+    user_id, karma = instance.user_id, instance.karma
+    transaction.on_commit(lambda: KarmaLeaderboard.total_karma_changed(user_id, karma))
+
+
+@receiver(post_save, sender=KarmaActivityLog)
+def karma_activity_log_saved(sender, instance, created, **kwargs):
+    start_date, end_date = DateTimeUtils.get_current_month_range()
+    if not created:
+        invalidate_on_commit(KarmaLeaderboard.invalidate_monthly)
+    elif instance.user_id and start_date <= instance.created_at < end_date:
+        user_id, karma = instance.user_id, instance.karma
+        transaction.on_commit(lambda: KarmaLeaderboard.karma_logged(user_id, karma))
+
+
+@receiver(post_delete, sender=KarmaActivityLog)
+def karma_activity_log_deleted(sender, instance, **kwargs):
+    invalidate_on_commit(KarmaLeaderboard.invalidate_monthly)
+
+
+@receiver(post_delete, sender=TotalKarma)
+def total_karma_deleted(sender, instance, **kwargs):
+    invalidate_on_commit(KarmaLeaderboard.invalidate)
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.dashboard.export.export_helper import ExportJobStore, run_pending_exports
+
+
+class Command(BaseCommand):
+    help = "Builds queued CSV exports"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=2, help="Seconds between polls")
+        parser.add_argument("--once", action="store_true", help="Run queued exports and exit")
+
+    def handle(self, *args, **options):
+        while True:
+            ExportJobStore.recover_stale()
+            run_pending_exports()
+            if options["once"]:
+                return
+            ExportJobStore.purge_expired()
+            time.sleep(options["interval"])
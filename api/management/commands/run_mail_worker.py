@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from utils.mail_outbox import MailOutbox
+
+
+class Command(BaseCommand):
+    help = "Sends queued mail from the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=5, help="Seconds between polls")
+        parser.add_argument("--once", action="store_true", help="Send due mail and exit")
+
+    def handle(self, *args, **options):
+        while True:
+            MailOutbox.recover_stale()
+            MailOutbox.drain()
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,47 @@
+import logging
+import re
+
+import requests
+
+from api.integrations.integrations_helper import fetch_kkem_jobseeker
+from db.integrations import IntegrationAuthorization
+from db.user import User
+
+logger = logging.getLogger(__name__)
+
+
+def get_available_mu_id(full_name: str) -> str:
+    """
+    Returns the first free muid of ``full_name@mulearn``, ``full_name-1@mulearn``,
+    ``full_name-2@mulearn``... with one query for every muid taken with that prefix.
+    """
+    pattern = re.compile(rf"{re.escape(full_name)}(?:-(\d+))?@mulearn")
+    taken = set()
+    for mu_id in User.objects.filter(
+        mu_id__startswith=full_name, mu_id__endswith="@mulearn"
+    ).values_list("mu_id", flat=True):
+        if match := pattern.fullmatch(mu_id):
+            taken.add(int(match[1] or 0))
+
+    counter = 0
+    while counter in taken:
+        counter += 1
+    return f"{full_name}@mulearn" if counter == 0 else f"{full_name}-{counter}@mulearn"
+
+
+def verify_kkem_jsid(authorization_id, jsid, token):
+    """
+    Checks a job seeker id given at registration with KKEM and removes the link to it
+    when KKEM does not know it. Runs in the background after the user is created.
+    """
+    try:
+        response_data = fetch_kkem_jobseeker(jsid, token)
+    except (requests.RequestException, ValueError):
+        logger.exception("Could not verify KKEM jsid %s", jsid)
+        return
+
+    if "response" not in response_data or not response_data["response"].get(
+        "req_status", False
+    ):
+        logger.warning("Removing KKEM link to invalid jsid %s", jsid)
+        IntegrationAuthorization.objects.filter(id=authorization_id).delete()
@@ -1,6 +1,3 @@
-import decouple
-import requests
-from django.core.mail import send_mail
 from django.db.models import Q
 from django.utils.html import strip_tags
 from rest_framework.views import APIView
@@ -9,13 +6,13 @@ from api.integrations.kkem.kkem_serializer import KKEMAuthorization
 from db.organization import Country, Department, District, Organization, State, Zone
 from db.task import InterestGroup
 from db.user import Role, User
+from utils.http_client import AUTH, HttpClient
 from utils.response import CustomResponse
 from utils.types import OrganizationType
 from utils.utils import send_template_mail
 
 from . import serializers
 
-
 class LearningCircleUserViewAPI(APIView):
     def post(self, request):
         mu_id = request.headers.get("muid")
@@ -51,9 +48,8 @@ class RegisterDataAPI(APIView):
                 ).get_failure_response()
 
             user_obj, password = create_user.save()
-            auth_domain = decouple.config("AUTH_DOMAIN")
-            response = requests.post(
-                f"{auth_domain}/api/v1/auth/user-authentication/",
+            response = HttpClient.get(AUTH).post(
+                "/api/v1/auth/user-authentication/",
                 data={"emailOrMuid": user_obj.mu_id, "password": password},
             )
             response = response.json()
@@ -71,6 +67,7 @@ class RegisterDataAPI(APIView):
                 "refreshToken": refresh_token,
             }
 
+            # only renders the mail and queues it in the durable outbox
             send_template_mail(
                 context=user_obj,
                 subject="YOUR TICKET TO µFAM IS HERE!",
@@ -2,7 +2,6 @@ from uuid import uuid4
 
 from django.contrib.auth.hashers import make_password
 from django.db import transaction
-import requests
 from rest_framework import serializers
 from db.integrations import Integration, IntegrationAuthorization
 
@@ -11,8 +10,10 @@ from db.organization import District, Department, Organization, UserOrganization
 from db.task import InterestGroup, TotalKarma, UserIgLink, KarmaActivityLog, TaskList
 from db.task import UserLvlLink, Level
 from db.user import Role, User, UserRoleLink, UserSettings, UserReferralLink, Socials
+from utils.background import BackgroundTasks
 from utils.types import IntegrationType, RoleType, TasksTypesHashtag
 from utils.utils import DateTimeUtils
+from .register_helper import get_available_mu_id, verify_kkem_jsid
 
 
 class LearningCircleUserSerializer(serializers.ModelSerializer):
@@ -100,11 +101,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         else:
             full_name = validated_data["first_name"] + validated_data["last_name"]
         full_name = full_name.replace(" ", "").lower()[:85]
-        mu_id = f"{full_name}@mulearn"
-        counter = 0
-        while User.objects.filter(mu_id=mu_id).exists():
-            counter += 1
-            mu_id = f"{full_name}-{counter}@mulearn"
+        mu_id = get_available_mu_id(full_name)
         role_id = validated_data.pop("role")
         organization_ids = validated_data.pop("organizations")
         dept = validated_data.pop("dept")
@@ -122,18 +119,6 @@ class RegisterSerializer(serializers.ModelSerializer):
 
             integration = Integration.objects.get(name=IntegrationType.KKEM.value)
 
-            response = requests.post(
-                url="https://stagging.knowledgemission.kerala.gov.in/MuLearn/api/jobseeker-details",
-                data=f'{{"job_seeker_id": {jsid}}}',
-                headers={"Authorization": f"Bearer {integration.token}"},
-            )
-            response_data = response.json()
-
-            if "response" not in response_data or not response_data["response"].get(
-                "req_status", False
-            ):
-                raise ValueError("Invalid jsid")
-
         referral_provider = None
         user_role_verified = True
         
@@ -148,13 +133,14 @@ class RegisterSerializer(serializers.ModelSerializer):
             ).first()
             karma_amount = getattr(task_list, "karma", 0)
 
+        now = DateTimeUtils.get_current_utc_time()
         with transaction.atomic():
             user = User.objects.create(
                 **validated_data,
                 id=uuid4(),
                 mu_id=mu_id,
                 password=hashed_password,
-                created_at=DateTimeUtils.get_current_utc_time(),
+                created_at=now,
             )
 
             TotalKarma.objects.create(
@@ -162,18 +148,18 @@ class RegisterSerializer(serializers.ModelSerializer):
                 user=user,
                 karma=0,
                 created_by=user,
-                created_at=DateTimeUtils.get_current_utc_time(),
+                created_at=now,
                 updated_by=user,
-                updated_at=DateTimeUtils.get_current_utc_time(),
+                updated_at=now,
             )
 
             Socials.objects.create(
                 id=uuid4(),
                 user=user,
                 created_by=user,
-                created_at=DateTimeUtils.get_current_utc_time(),
+                created_at=now,
                 updated_by=user,
-                updated_at=DateTimeUtils.get_current_utc_time(),
+                updated_at=now,
             )
 
             if role_id:
@@ -182,7 +168,7 @@ class RegisterSerializer(serializers.ModelSerializer):
                     user=user,
                     role_id=role_id,
                     created_by=user,
-                    created_at=DateTimeUtils.get_current_utc_time(),
+                    created_at=now,
                     verified=user_role_verified,
                 )
 
@@ -194,7 +180,7 @@ class RegisterSerializer(serializers.ModelSerializer):
                             user=user,
                             org_id=org_id,
                             created_by=user,
-                            created_at=DateTimeUtils.get_current_utc_time(),
+                            created_at=now,
                             verified=True,
                             department_id=dept,
                             graduation_year=year_of_graduation,
@@ -210,7 +196,7 @@ class RegisterSerializer(serializers.ModelSerializer):
                         user=user,
                         ig_id=ig,
                         created_by=user,
-                        created_at=DateTimeUtils.get_current_utc_time(),
+                        created_at=now,
                     )
                     for ig in area_of_interests
                 ]
@@ -222,9 +208,9 @@ class RegisterSerializer(serializers.ModelSerializer):
                     user=user,
                     level=level,
                     updated_by=user,
-                    updated_at=DateTimeUtils.get_current_utc_time(),
+                    updated_at=now,
                     created_by=user,
-                    created_at=DateTimeUtils.get_current_utc_time(),
+                    created_at=now,
                 )
 
             UserSettings.objects.create(
@@ -232,9 +218,9 @@ class RegisterSerializer(serializers.ModelSerializer):
                 user=user,
                 is_public=0,
                 created_by=user,
-                created_at=DateTimeUtils.get_current_utc_time(),
+                created_at=now,
                 updated_by=user,
-                updated_at=DateTimeUtils.get_current_utc_time(),
+                updated_at=now,
             )
 
             if referral_id:
@@ -243,9 +229,9 @@ class RegisterSerializer(serializers.ModelSerializer):
                     referral=referral_provider,
                     user=user,
                     created_by=user,
-                    created_at=DateTimeUtils.get_current_utc_time(),
+                    created_at=now,
                     updated_by=user,
-                    updated_at=DateTimeUtils.get_current_utc_time(),
+                    updated_at=now,
                 )
                 KarmaActivityLog.objects.create(
                     id=uuid4(),
@@ -253,13 +239,13 @@ class RegisterSerializer(serializers.ModelSerializer):
                     task=task_list,
                     created_by=user,
                     user=referral_provider,
-                    created_at=DateTimeUtils.get_current_utc_time(),
+                    created_at=now,
                     appraiser_approved=True,
                     peer_approved=True,
                     appraiser_approved_by=user,
                     peer_approved_by=user,
                     updated_by=user,
-                    updated_at=DateTimeUtils.get_current_utc_time(),
+                    updated_at=now,
                 )
 
                 referrer_karma = TotalKarma.objects.filter(
@@ -267,18 +253,23 @@ class RegisterSerializer(serializers.ModelSerializer):
                 ).first()
 
                 referrer_karma.karma += karma_amount
-                referrer_karma.updated_at = DateTimeUtils.get_current_utc_time()
+                referrer_karma.updated_at = now
                 referrer_karma.updated_by = user
                 referrer_karma.save()
                 
             if jsid:
-                IntegrationAuthorization.objects.create(
+                kkem_link = IntegrationAuthorization.objects.create(
                     id=uuid4(),
                     user=user,
                     integration=integration,
                     integration_value=jsid,
-                    created_at=DateTimeUtils.get_current_utc_time(),
-                    updated_at=DateTimeUtils.get_current_utc_time(),
+                    created_at=now,
+                    updated_at=now,
+                )
+                # KKEM is asked about the jsid once the user exists, the link is
+                # dropped again if it turns out to be invalid
+                BackgroundTasks.submit_on_commit(
+                    verify_kkem_jsid, kkem_link.id, jsid, integration.token
                 )
 
         return user, password
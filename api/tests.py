@@ -0,0 +1,236 @@
+import logging
+import os
+import tempfile
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from api.dashboard.export.export_helper import DONE, ExportJobStore
+from api.dashboard.lc.dash_lc_helper import CircleKarmaIndex
+from api.dashboard.organisation.organisation_views import InstitutionsAPI
+from api.leaderboard.leaderboard_helper import KarmaLeaderboard
+from api.register.serializers import RegisterSerializer
+from db.learning_circle import LearningCircle
+from utils.karma_rollup import OrgKarmaRollup
+from utils.testing import (
+    give_karma,
+    link_org,
+    make_district,
+    make_interest_group,
+    make_org,
+    make_token,
+    make_user,
+)
+from utils.types import OrganizationType, RoleType
+from utils.utils import DateTimeUtils
+
+logger = logging.getLogger(__name__)
+
+
+def count_queries(func):
+    queries = []
+    with connection.execute_wrapper(lambda execute, *args: queries.append(args[0]) or execute(*args)):
+        result = func()
+    return len(queries), result
+
+
+class InstitutionRankQueryTests(TestCase):
+    """
+    Ranking a college must cost the same number of queries however many organizations
+    and members there are.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("admin")
+        cls.district = make_district(cls.admin)
+        cls.college = make_org(cls.admin, cls.district, "COL0", OrganizationType.COLLEGE.value)
+        cls.token = make_token(cls.admin, [RoleType.ADMIN.value])
+        leader = make_user("leader")
+        give_karma(leader, 1000)
+        link_org(leader, cls.college)
+        cls.org_count = 1
+
+    def add_colleges(self, count):
+        for _ in range(count):
+            college = make_org(
+                self.admin, self.district, f"COL{self.org_count}", OrganizationType.COLLEGE.value
+            )
+            for member in range(2):
+                user = make_user(f"{college.code.lower()}-{member}")
+                give_karma(user, self.org_count + member)
+                link_org(user, college)
+            self.org_count += 1
+
+    def rank_college(self):
+        # a cold rollup, so the count covers building it
+        OrgKarmaRollup._rollup = None
+        request = APIRequestFactory().post("/", HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+        query_count, response = count_queries(
+            lambda: InstitutionsAPI.as_view()(request, org_code=self.college.code)
+        )
+        self.assertEqual(response.status_code, 200)
+        return query_count, response.data["response"]
+
+    def test_query_count_does_not_grow_with_organizations(self):
+        self.add_colleges(5)
+        small_count, small = self.rank_college()
+        self.add_colleges(50)
+        large_count, large = self.rank_college()
+
+        self.assertEqual(large_count, small_count)
+        self.assertEqual((small["rank"], small["score"]), ("1", "1000"))
+        self.assertEqual((large["rank"], large["score"]), ("1", "1000"))
+
+
+class KarmaLeaderboardPatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        admin = make_user("admin")
+        college = make_org(admin, make_district(admin), "COL", OrganizationType.COLLEGE.value)
+        cls.user = make_user("student")
+        link_org(cls.user, college)
+        cls.total_karma = give_karma(cls.user, 10)
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        KarmaLeaderboard.students()
+
+    def set_karma(self, karma, execute):
+        self.total_karma.karma = karma
+        with self.captureOnCommitCallbacks(execute=execute):
+            self.total_karma.save()
+
+    def test_patches_the_board_once_the_write_commits(self):
+        self.set_karma(500, execute=False)
+        self.assertEqual(KarmaLeaderboard.students()[0]["total_karma"], 10)
+
+        self.set_karma(500, execute=True)
+        self.assertEqual(KarmaLeaderboard.students()[0]["total_karma"], 500)
+
+    def test_drops_a_board_another_worker_is_patching(self):
+        cache.add(f"{KarmaLeaderboard.STUDENTS}:lock", True)
+        self.set_karma(500, execute=True)
+
+        self.assertIsNone(cache.get(KarmaLeaderboard.STUDENTS))
+        cache.delete(f"{KarmaLeaderboard.STUDENTS}:lock")
+        self.assertEqual(KarmaLeaderboard.students()[0]["total_karma"], 500)
+
+
+class CircleKarmaIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("admin")
+        cls.interest_group = make_interest_group(cls.admin, "web")
+        cls.college = make_org(cls.admin, make_district(cls.admin), "COL", OrganizationType.COLLEGE.value)
+        cls.circle = cls.make_circle("first")
+
+    @classmethod
+    def make_circle(cls, name):
+        return LearningCircle.objects.create(
+            id=str(uuid.uuid4()),
+            name=name,
+            circle_code=name.upper(),
+            ig=cls.interest_group,
+            org=cls.college,
+            created_by=cls.admin,
+            updated_by=cls.admin,
+            created_at=DateTimeUtils.get_current_utc_time(),
+            updated_at=DateTimeUtils.get_current_utc_time(),
+        )
+
+    def setUp(self):
+        CircleKarmaIndex._indexes.clear()
+        self.addCleanup(CircleKarmaIndex._indexes.clear)
+        CircleKarmaIndex.get(self.circle)
+
+    def test_skips_circles_that_roll_back(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                circle_id = self.make_circle("second").id
+                raise IntegrityError
+
+        self.assertNotIn(circle_id, CircleKarmaIndex._indexes[self.interest_group.id].karma)
+
+    def test_picks_up_circles_once_they_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            circle_id = self.make_circle("second").id
+
+        self.assertIn(circle_id, CircleKarmaIndex._indexes[self.interest_group.id].karma)
+
+
+class ExportJobStoreTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(EXPORT_ROOT=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_claims_a_queued_job_once(self):
+        job = ExportJobStore.create("users", {}, "user")
+        self.assertEqual(ExportJobStore.claim(job["id"])["attempts"], 1)
+        self.assertIsNone(ExportJobStore.claim(job["id"]))
+
+    def test_leaves_no_lock_on_a_job_it_does_not_claim(self):
+        job = ExportJobStore.create("users", {}, "user")
+        job["status"] = DONE
+        ExportJobStore.save(job)
+
+        self.assertIsNone(ExportJobStore.claim(job["id"]))
+        self.assertFalse(os.path.exists(ExportJobStore.lock_path(job["id"])))
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class RegistrationBenchmarkTests(TestCase):
+    """
+    Registers users who all share a name, so every one of them needs a new muid suffix,
+    and reports registrations per second with password hashing taken out.
+    """
+
+    REGISTRATIONS = 200
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.interest_group = make_interest_group(make_user("admin"), "web")
+
+    def register(self, i):
+        serializer = RegisterSerializer(
+            data={
+                "first_name": "Bench",
+                "last_name": None,
+                "email": f"bench{i}@mulearn.org",
+                "mobile": "9000000000",
+                "organizations": None,
+                "area_of_interests": [self.interest_group.id],
+                "password": "password",
+                "role": None,
+                "dept": None,
+                "year_of_graduation": None,
+                "referral_id": None,
+            }
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        user, _ = serializer.save()
+        return user
+
+    def test_registration_cost_does_not_grow_with_taken_muids(self):
+        first_count, first = count_queries(lambda: self.register(0))
+
+        start = time.perf_counter()
+        for i in range(1, self.REGISTRATIONS):
+            self.register(i)
+        elapsed = time.perf_counter() - start
+
+        last_count, last = count_queries(lambda: self.register(self.REGISTRATIONS))
+        logger.info("%.0f registrations/sec", (self.REGISTRATIONS - 1) / elapsed)
+
+        self.assertEqual(last_count, first_count)
+        self.assertEqual(first.mu_id, "bench@mulearn")
+        self.assertEqual(last.mu_id, f"bench-{self.REGISTRATIONS}@mulearn")
@@ -0,0 +1,4 @@
+-- Keyset order of the KKEM karma change feed (api/integrations/kkem/kkem_helper.py).
+-- The karma_activity_log table is not managed by Django, so this index is not created
+-- by migrations and has to be applied by hand once per database.
+CREATE INDEX karma_log_updated_at_idx ON karma_activity_log (updated_at, id);
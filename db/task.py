@@ -241,6 +241,10 @@ class KarmaActivityLog(models.Model):
     class Meta:
         managed = False
         db_table = "karma_activity_log"
+        indexes = [
+            # keyset order of the KKEM karma change feed, created by db/sql/karma_log_updated_at_idx.sql
+            models.Index(fields=["updated_at", "id"], name="karma_log_updated_at_idx"),
+        ]
 
 
 class UserIgLink(models.Model):
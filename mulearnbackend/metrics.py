@@ -0,0 +1,193 @@
+import bisect
+import contextvars
+import hmac
+import threading
+from time import perf_counter
+
+import decouple
+from django.http import HttpResponse, HttpResponseNotFound
+from rest_framework.serializers import BaseSerializer
+
+REQUEST_SECONDS = "mulearn_request_seconds"
+REQUEST_QUERIES = "mulearn_request_queries"
+REQUEST_DB_SECONDS = "mulearn_request_db_seconds"
+REQUEST_SERIALIZER_SECONDS = "mulearn_request_serializer_seconds"
+OUTBOUND_SECONDS = "mulearn_outbound_request_seconds"
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+REQUEST_LABELS = ("view", "method")
+
+METRICS = {
+    REQUEST_SECONDS: ("Total time spent handling the request.", SECONDS_BUCKETS, REQUEST_LABELS),
+    REQUEST_QUERIES: ("SQL queries run while handling the request.", QUERY_BUCKETS, REQUEST_LABELS),
+    REQUEST_DB_SECONDS: ("Time spent in SQL queries.", SECONDS_BUCKETS, REQUEST_LABELS),
+    REQUEST_SERIALIZER_SECONDS: (
+        "Time spent building serializer data.",
+        SECONDS_BUCKETS,
+        REQUEST_LABELS,
+    ),
+    OUTBOUND_SECONDS: (
+        "Time spent on calls to outside services, retries included.",
+        SECONDS_BUCKETS,
+        ("integration", "outcome"),
+    ),
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(max_queries: int):
+    """
+    Declares the most SQL queries a view may run per request.
+
+        @query_budget(5)
+        class ProfileAPI(APIView):
+            ...
+
+    Over-budget requests are logged, or raise QueryBudgetExceeded when
+    QUERY_BUDGET_STRICT is set (as it should be when running tests).
+    """
+
+    def decorator(view_class):
+        view_class.query_budget = max_queries
+        return view_class
+
+    return decorator
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+
+
+current_stats = contextvars.ContextVar("current_stats", default=None)
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """
+    Per-process histograms of request metrics, labelled by view and method, and of
+    calls to outside services, labelled by integration and outcome.
+
+    Every gunicorn worker keeps its own registry; Prometheus adds them up across
+    scrapes of the workers.
+    """
+
+    _histograms = {}
+    _gauges = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def register_gauge(cls, metric, description, getter, kind="gauge", labels=()):
+        """
+        Adds a value read from ``getter`` at every scrape, such as a queue depth. With
+        ``labels``, the getter returns a dict of label values tuples to values instead.
+        """
+        cls._gauges[metric] = (description, kind, getter, labels)
+
+    @classmethod
+    def observe(cls, metric, labels: tuple, value):
+        with cls._lock:
+            histogram = cls._histograms.get((metric, labels))
+            if histogram is None:
+                histogram = cls._histograms[metric, labels] = _Histogram(METRICS[metric][1])
+            histogram.observe(value)
+
+    @classmethod
+    def render(cls) -> str:
+        with cls._lock:
+            histograms = {
+                key: (list(histogram.counts), histogram.sum)
+                for key, histogram in cls._histograms.items()
+            }
+
+        lines = []
+        for metric, (description, buckets, label_names) in METRICS.items():
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} histogram")
+            for (name, label_values), (counts, total) in sorted(histograms.items()):
+                if name != metric:
+                    continue
+                labels = ",".join(
+                    f'{label}="{_escape(str(value))}"'
+                    for label, value in zip(label_names, label_values)
+                )
+                cumulative = 0
+                for bound, count in zip((*buckets, "+Inf"), counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{metric}_sum{{{labels}}} {total}")
+                lines.append(f"{metric}_count{{{labels}}} {cumulative}")
+
+        for metric, (description, kind, getter, label_names) in cls._gauges.items():
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} {kind}")
+            if not label_names:
+                lines.append(f"{metric} {getter()}")
+                continue
+            for label_values, value in sorted(getter().items()):
+                labels = ",".join(
+                    f'{label}="{_escape(str(label_value))}"'
+                    for label, label_value in zip(label_names, label_values)
+                )
+                lines.append(f"{metric}{{{labels}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _timed_serializer_data(data):
+    def fget(self):
+        stats = current_stats.get()
+        if stats is None or stats.serializing:
+            return data.fget(self)
+
+        stats.serializing = True
+        start = perf_counter()
+        try:
+            return data.fget(self)
+        finally:
+            stats.serializer_time += perf_counter() - start
+            stats.serializing = False
+
+    return property(fget)
+
+
+def instrument_serializers():
+    # Serializer.data and ListSerializer.data both defer to BaseSerializer.data
+    if not getattr(BaseSerializer.data.fget, "is_instrumented", False):
+        BaseSerializer.data = _timed_serializer_data(BaseSerializer.data)
+        BaseSerializer.data.fget.is_instrumented = True
+
+
+def metrics_view(request):
+    token = decouple.config("METRICS_TOKEN", default="")
+    if not token:
+        return HttpResponseNotFound()
+
+    authorization = request.META.get("HTTP_AUTHORIZATION", "")
+    if not hmac.compare_digest(authorization, f"Bearer {token}"):
+        return HttpResponse(status=401)
+
+    return HttpResponse(
+        MetricsRegistry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
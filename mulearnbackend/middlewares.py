@@ -1,11 +1,26 @@
 import hmac
 import logging
+from contextlib import ExitStack
+from time import perf_counter
 
 import decouple
+from django.conf import settings
+from django.db import connections
 from django.http import JsonResponse
 from rest_framework import status
 
 from utils.utils import _CustomHTTPHandler
+from .metrics import (
+    REQUEST_DB_SECONDS,
+    REQUEST_QUERIES,
+    REQUEST_SECONDS,
+    REQUEST_SERIALIZER_SECONDS,
+    MetricsRegistry,
+    QueryBudgetExceeded,
+    RequestStats,
+    current_stats,
+    instrument_serializers,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -64,3 +79,57 @@ class ApiSignatureMiddleware(object):
                 )
         response = self.get_response(request)
         return response
+
+
+class RequestMetricsMiddleware(object):
+    """
+    Records the query count, SQL time, serializer time and total latency of every
+    request against the route it resolved to, and enforces declared query budgets.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrument_serializers()
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        start = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self.count_query))
+                response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+
+        elapsed = perf_counter() - start
+        match = request.resolver_match
+        view = (match.url_name or match.route) if match else "unmatched"
+        labels = (view, request.method)
+
+        MetricsRegistry.observe(REQUEST_SECONDS, labels, elapsed)
+        MetricsRegistry.observe(REQUEST_QUERIES, labels, stats.queries)
+        MetricsRegistry.observe(REQUEST_DB_SECONDS, labels, stats.db_time)
+        MetricsRegistry.observe(REQUEST_SERIALIZER_SECONDS, labels, stats.serializer_time)
+
+        view_class = getattr(match.func, "view_class", None) if match else None
+        budget = getattr(view_class, "query_budget", None)
+        if budget is not None and stats.queries > budget:
+            message = f"{request.method} {view} ran {stats.queries} queries, budget is {budget}"
+            if getattr(settings, "QUERY_BUDGET_STRICT", False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+    @staticmethod
+    def count_query(execute, sql, params, many, context):
+        stats = current_stats.get()
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if stats is not None:
+                stats.queries += 1
+                stats.db_time += perf_counter() - start
@@ -54,8 +54,12 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "mulearnbackend.middlewares.RequestMetricsMiddleware",
 ]
 
+# raise instead of logging when a view runs more queries than its declared budget
+QUERY_BUDGET_STRICT = config("QUERY_BUDGET_STRICT", default=False, cast=bool)
+
 ROOT_URLCONF = "mulearnbackend.urls"
 CORS_ALLOW_ALL_ORIGINS = True
 
@@ -94,6 +98,20 @@ DATABASES = {
     }
 }
 
+TEST_RUNNER = "mulearnbackend.test_runner.UnmanagedModelTestRunner"
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND", default="django.core.cache.backends.filebased.FileBasedCache"
+        ),
+        "LOCATION": config("CACHE_LOCATION", default=os.path.join(BASE_DIR, "cache")),
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -196,6 +214,11 @@ STATIC_URL = '/muback-static/'
 MEDIA_URL = '/muback-media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# background CSV exports: "thread" builds them on a thread of the web process, "process"
+# expects `manage.py run_export_worker` to be running
+EXPORT_ROOT = config("EXPORT_ROOT", default=os.path.join(BASE_DIR, 'exports'))
+EXPORT_WORKER = config("EXPORT_WORKER", default="thread")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
@@ -208,6 +231,10 @@ EMAIL_HOST_USER = config("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD")
 EMAIL_PORT = config("EMAIL_PORT")
 EMAIL_USE_TLS = config("EMAIL_USE_TLS")
+
+# outgoing mail is queued here; MAIL_WORKER is "thread", "process" (`manage.py run_mail_worker`) or "sync"
+MAIL_OUTBOX_ROOT = config("MAIL_OUTBOX_ROOT", default=os.path.join(BASE_DIR, 'outbox'))
+MAIL_WORKER = config("MAIL_WORKER", default="thread")
 from_mail = decouple.config('FROM_MAIL')
 
 DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
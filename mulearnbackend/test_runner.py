@@ -0,0 +1,24 @@
+from django.apps import apps
+from django.db import connections
+from django.test.runner import DiscoverRunner
+
+
+class UnmanagedModelTestRunner(DiscoverRunner):
+    """
+    Creates the tables of the unmanaged models in the test database.
+
+    The tables of the real database are not managed by Django and the db app has no
+    migrations, so the test database would otherwise be created without them.
+    """
+
+    def setup_databases(self, **kwargs):
+        old_config = super().setup_databases(**kwargs)
+        unmanaged_models = [model for model in apps.get_models() if not model._meta.managed]
+        for alias in connections:
+            connection = connections[alias]
+            existing_tables = set(connection.introspection.table_names())
+            with connection.schema_editor() as schema_editor:
+                for model in unmanaged_models:
+                    if model._meta.db_table not in existing_tables:
+                        schema_editor.create_model(model)
+        return old_config
@@ -19,9 +19,12 @@ from django.conf.urls.static import static
 # from django.contrib import admin
 from django.urls import path, include
 
+from .metrics import metrics_view
+
 urlpatterns = [
     # path('admin/', admin.site.urls),
     path('api/v1/', include('api.urls')),
+    path('metrics/', metrics_view),
 
 ]
 
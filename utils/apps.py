@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class UtilsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'utils'
+
+    def ready(self):
+        # connect the karma write hooks that keep the rank index and rollups current
+        from . import karma_rank, karma_rollup  # noqa: F401
@@ -0,0 +1,49 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 4
+
+
+class BackgroundTasks:
+    """
+    Small thread pool of the web process for side effects a response should not wait
+    for, like rendering mail or calling a partner API.
+
+    Tasks are not persisted: anything that has to survive a restart belongs in a
+    durable queue such as the mail outbox.
+    """
+
+    _executor = None
+
+    @classmethod
+    def _get_executor(cls):
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=MAX_WORKERS, thread_name_prefix="background"
+            )
+        return cls._executor
+
+    @staticmethod
+    def _run(func, args, kwargs):
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            logger.exception("Background task %s failed", func.__qualname__)
+        finally:
+            close_old_connections()
+
+    @classmethod
+    def submit(cls, func, *args, **kwargs):
+        return cls._get_executor().submit(cls._run, func, args, kwargs)
+
+    @classmethod
+    def submit_on_commit(cls, func, *args, **kwargs):
+        """
+        Runs ``func`` once the current transaction commits, so it sees the rows written
+        in it, and not at all if it rolls back.
+        """
+        transaction.on_commit(lambda: cls.submit(func, *args, **kwargs))
@@ -0,0 +1,13 @@
+from django.db import transaction
+
+
+def invalidate_on_commit(invalidate, *args):
+    """
+    Calls ``invalidate(*args)`` once the current transaction commits, and not at all
+    if it rolls back.
+
+    Read models are rebuilt from the tables on the next read after being dropped. Dropped
+    before the commit, a read in between would rebuild them from the old rows and cache
+    those again until they expire.
+    """
+    transaction.on_commit(lambda: invalidate(*args))
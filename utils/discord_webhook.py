@@ -0,0 +1,126 @@
+import logging
+import queue
+import threading
+import time
+
+import decouple
+import requests
+
+from mulearnbackend.metrics import MetricsRegistry
+from utils.http_client import DISCORD, HttpClient
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 1000
+# identical events queued again within this many seconds are sent once
+COALESCE_WINDOW = 2
+# Discord lets a webhook post 5 messages every 2 seconds
+RATE_LIMIT = 5
+RATE_PERIOD = 2
+MAX_ATTEMPTS = 3
+
+
+class DiscordWebhookDispatcher:
+    """
+    Posts webhook messages from a background thread of the web process.
+
+    Messages wait in a bounded queue and are dropped when it is full, so a slow or
+    unreachable Discord never holds up a request. A message queued again while an
+    identical one is pending, or was sent less than COALESCE_WINDOW seconds ago, is
+    sent once. Posts go through the shared Discord HttpClient and are paced to the
+    webhook's rate limit, waiting out any 429 Discord still answers with.
+    """
+
+    _queue = queue.Queue(maxsize=QUEUE_SIZE)
+    _recent = {}
+    _thread = None
+    _lock = threading.Lock()
+    _sent_at = []
+
+    stats = {"sent": 0, "dropped": 0, "coalesced": 0, "failed": 0}
+
+    @classmethod
+    def dispatch(cls, content):
+        now = time.monotonic()
+        with cls._lock:
+            if cls._thread is None or not cls._thread.is_alive():
+                cls._thread = threading.Thread(target=cls._work, daemon=True)
+                cls._thread.start()
+
+            cls._recent = {
+                key: seen_at
+                for key, seen_at in cls._recent.items()
+                if seen_at is None or now - seen_at < COALESCE_WINDOW
+            }
+            if content in cls._recent:
+                cls.stats["coalesced"] += 1
+                return
+
+            try:
+                cls._queue.put_nowait(content)
+            except queue.Full:
+                cls.stats["dropped"] += 1
+                logger.warning("Discord webhook queue is full, dropped %r", content)
+                return
+            # None while queued, the time it was sent afterwards
+            cls._recent[content] = None
+
+    @classmethod
+    def join(cls):
+        cls._queue.join()
+
+    @classmethod
+    def _wait_for_slot(cls):
+        cls._sent_at = [
+            sent_at for sent_at in cls._sent_at if time.monotonic() - sent_at < RATE_PERIOD
+        ]
+        if len(cls._sent_at) >= RATE_LIMIT:
+            time.sleep(RATE_PERIOD - (time.monotonic() - cls._sent_at[0]))
+        cls._sent_at.append(time.monotonic())
+
+    @classmethod
+    def _post(cls, url, content):
+        for _ in range(MAX_ATTEMPTS):
+            cls._wait_for_slot()
+            response = HttpClient.get(DISCORD).post(url, json={"content": content})
+            if response.status_code != 429:
+                response.raise_for_status()
+                return
+            retry_after = response.headers.get("Retry-After", RATE_PERIOD)
+            time.sleep(float(retry_after))
+        raise requests.HTTPError("Discord rate limit not lifted", response=response)
+
+    @classmethod
+    def _work(cls):
+        while True:
+            content = cls._queue.get()
+            try:
+                if url := decouple.config("DISCORD_WEBHOOK_LINK", default=""):
+                    cls._post(url, content)
+                    cls.stats["sent"] += 1
+            except Exception:
+                cls.stats["failed"] += 1
+                logger.exception("Discord webhook failed for %r", content)
+            finally:
+                with cls._lock:
+                    cls._recent[content] = time.monotonic()
+                cls._queue.task_done()
+
+
+MetricsRegistry.register_gauge(
+    "mulearn_discord_webhook_queue_depth",
+    "Discord webhook messages waiting to be sent.",
+    DiscordWebhookDispatcher._queue.qsize,
+)
+for _name, _description in (
+    ("sent", "Discord webhook messages sent."),
+    ("dropped", "Discord webhook messages dropped because the queue was full."),
+    ("coalesced", "Discord webhook messages merged into an identical pending one."),
+    ("failed", "Discord webhook messages that could not be sent."),
+):
+    MetricsRegistry.register_gauge(
+        f"mulearn_discord_webhook_{_name}_total",
+        _description,
+        lambda _name=_name: DiscordWebhookDispatcher.stats[_name],
+        kind="counter",
+    )
@@ -0,0 +1,156 @@
+import logging
+import threading
+import time
+from time import perf_counter
+
+import decouple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from mulearnbackend.metrics import OUTBOUND_SECONDS, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+KKEM = "kkem"
+AUTH = "auth"
+DISCORD = "discord"
+
+# name -> base url setting and default, (connect, read) timeout, retries, whether a
+# POST may be retried after it reached the server
+INTEGRATIONS = {
+    KKEM: {
+        "base_url": ("KKEM_BASE_URL", "https://stagging.knowledgemission.kerala.gov.in/MuLearn"),
+        "timeout": (3.05, 10),
+        "retries": 2,
+        "idempotent": True,
+    },
+    AUTH: {
+        "base_url": ("AUTH_DOMAIN", ""),
+        "timeout": (3.05, 10),
+        "retries": 1,
+        "idempotent": True,
+    },
+    DISCORD: {
+        "base_url": (None, ""),
+        "timeout": (3.05, 10),
+        # the webhook dispatcher retries rate limited posts itself
+        "retries": 0,
+        "idempotent": False,
+    },
+}
+
+POOL_SIZE = 10
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = (502, 503, 504)
+# consecutive failures that open the circuit, and how long it stays open
+FAILURE_THRESHOLD = 5
+RESET_AFTER = 30
+
+
+class CircuitOpenError(requests.ConnectionError):
+    pass
+
+
+class _CircuitBreaker:
+    def __init__(self):
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < RESET_AFTER:
+                return False
+            # half open: let this one call through to probe the service
+            self.opened_at = time.monotonic()
+            return True
+
+    def record(self, success):
+        with self.lock:
+            if success:
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                if self.failures >= FAILURE_THRESHOLD:
+                    self.opened_at = time.monotonic()
+
+
+class HttpClient:
+    """
+    Shared client for one outside service.
+
+    Keeps a pool of keep-alive connections per host, applies the service's timeout and
+    retry policy, and stops calling it for RESET_AFTER seconds once FAILURE_THRESHOLD
+    calls in a row failed. Paths are resolved against the service's base url setting,
+    so tests can point it at a local stub server.
+
+        response = HttpClient.get(KKEM).post("/api/jobseeker-details", data=...)
+    """
+
+    _clients = {}
+    _lock = threading.Lock()
+
+    def __init__(self, name):
+        config = INTEGRATIONS[name]
+        self.name = name
+        self.timeout = config["timeout"]
+        self.breaker = _CircuitBreaker()
+
+        setting, default = config["base_url"]
+        self.base_url = (decouple.config(setting, default=default) if setting else default).rstrip("/")
+
+        retry = Retry(
+            total=config["retries"],
+            backoff_factor=RETRY_BACKOFF,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=None if config["idempotent"] else Retry.DEFAULT_ALLOWED_METHODS,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @classmethod
+    def get(cls, name) -> "HttpClient":
+        if name not in cls._clients:
+            with cls._lock:
+                if name not in cls._clients:
+                    cls._clients[name] = cls(name)
+        return cls._clients[name]
+
+    @classmethod
+    def reset(cls):
+        """
+        Drops every client, so the next call reads the base url settings again.
+        """
+        with cls._lock:
+            for client in cls._clients.values():
+                client.session.close()
+            cls._clients = {}
+
+    def request(self, method, path, **kwargs) -> requests.Response:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} is unavailable, try again later")
+
+        url = path if path.startswith(("http://", "https://")) else f"{self.base_url}{path}"
+        kwargs.setdefault("timeout", self.timeout)
+        outcome = "error"
+        start = perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+            outcome = f"{response.status_code // 100}xx"
+            return response
+        finally:
+            MetricsRegistry.observe(OUTBOUND_SECONDS, (self.name, outcome), perf_counter() - start)
+            self.breaker.record(outcome != "error" and not outcome.startswith("5"))
+            if outcome == "error":
+                # the path is left out, some carry tokens
+                logger.warning("%s request to %s failed", method, self.name)
+
+    def post(self, path, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
@@ -0,0 +1,169 @@
+import bisect
+import threading
+import time
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from db.task import TotalKarma
+from db.user import UserRoleLink
+from utils.types import RoleType
+
+RANK_INDEX_TIMEOUT = 60 * 5
+
+
+def _karma_key(entry):
+    return entry[0]
+
+
+class KarmaIndex:
+    """
+    Karma of every user in a cohort (or of any other set of ids), ordered from highest
+    to lowest.
+
+    Entries are ``(-karma, user_id)`` tuples kept sorted, so both rank lookups and
+    updates are a binary search away.
+    """
+
+    def __init__(self, rows):
+        self.karma = dict(rows)
+        self.entries = sorted((-karma, user_id) for user_id, karma in self.karma.items())
+        # wall clock, callers compare it with when they read their own karma
+        self.built_at = time.time()
+
+    @property
+    def is_expired(self):
+        return time.time() - self.built_at > RANK_INDEX_TIMEOUT
+
+    def count_gte(self, karma):
+        return bisect.bisect_right(self.entries, -karma, key=_karma_key)
+
+    def count_gt(self, karma):
+        return bisect.bisect_left(self.entries, -karma, key=_karma_key)
+
+    def update(self, user_id, karma):
+        if (old_karma := self.karma.get(user_id)) is not None:
+            index = bisect.bisect_left(self.entries, (-old_karma, user_id))
+            del self.entries[index]
+        self.karma[user_id] = karma
+        bisect.insort(self.entries, (-karma, user_id))
+
+    def remove(self, user_id):
+        if (old_karma := self.karma.pop(user_id, None)) is not None:
+            index = bisect.bisect_left(self.entries, (-old_karma, user_id))
+            del self.entries[index]
+
+
+class KarmaRankIndex:
+    """
+    In-process rank index over TotalKarma, split into the cohorts profiles are ranked in:
+    mentors, enablers and everyone else.
+
+    Each gunicorn worker keeps its own index. Saves made through this service update it
+    in place; changes made elsewhere are picked up when the index expires.
+    """
+
+    MENTOR = RoleType.MENTOR.value
+    ENABLER = RoleType.ENABLER.value
+    LEARNER = "Learner"
+
+    _indexes = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_cohort(cls, roles) -> str:
+        if cls.MENTOR in roles:
+            return cls.MENTOR
+        if cls.ENABLER in roles:
+            return cls.ENABLER
+        return cls.LEARNER
+
+    @classmethod
+    def _fetch(cls, cohort):
+        queryset = TotalKarma.objects.all()
+        if cohort == cls.LEARNER:
+            queryset = queryset.exclude(
+                user__user_role_link_user__role__title__in=[cls.ENABLER, cls.MENTOR]
+            )
+        else:
+            queryset = queryset.filter(user__user_role_link_user__role__title=cohort)
+        return queryset.values_list("user_id", "karma").distinct()
+
+    @classmethod
+    def _get_index(cls, cohort) -> KarmaIndex:
+        index = cls._indexes.get(cohort)
+        if index is None or index.is_expired:
+            with cls._lock:
+                index = cls._indexes.get(cohort)
+                if index is None or index.is_expired:
+                    index = cls._indexes[cohort] = KarmaIndex(cls._fetch(cohort))
+        return index
+
+    @classmethod
+    def get_rank(cls, roles, karma, user_id=None, read_at=None) -> int | None:
+        """
+        Returns the number of users in the cohort of ``roles`` holding at least ``karma``,
+        or None if there are none.
+
+        ``user_id`` is the user holding ``karma`` and ``read_at`` the ``time.time()`` it
+        was read from the database. If that is newer than the index, the index takes the
+        value before counting, so a user is never ranked against their own old karma.
+        The karma of everybody else can still lag by up to RANK_INDEX_TIMEOUT.
+        """
+        index = cls._get_index(cls.get_cohort(roles))
+        if (
+            user_id is not None
+            and read_at is not None
+            and read_at > index.built_at
+            and index.karma.get(user_id) != karma
+        ):
+            with cls._lock:
+                index.update(user_id, karma)
+        rank = index.count_gte(karma)
+        return rank if rank > 0 else None
+
+    @classmethod
+    def update(cls, user_id, karma):
+        with cls._lock:
+            indexes = [index for index in cls._indexes.values() if user_id in index.karma]
+            if not indexes and cls._indexes:
+                roles = UserRoleLink.objects.filter(user_id=user_id).values_list(
+                    "role__title", flat=True
+                )
+                if index := cls._indexes.get(cls.get_cohort(set(roles))):
+                    indexes.append(index)
+
+            for index in indexes:
+                index.update(user_id, karma)
+
+    @classmethod
+    def remove(cls, user_id):
+        with cls._lock:
+            for index in cls._indexes.values():
+                index.remove(user_id)
+
+    @classmethod
+    def refresh_user(cls, user_id):
+        if not cls._indexes:
+            return
+        cls.remove(user_id)
+        karma = TotalKarma.objects.filter(user_id=user_id).values_list("karma", flat=True).first()
+        if karma is not None:
+            cls.update(user_id, karma)
+
+
+@receiver(post_save, sender=TotalKarma)
+def total_karma_saved(sender, instance, **kwargs):
+    KarmaRankIndex.update(instance.user_id, instance.karma)
+
+
+@receiver(post_delete, sender=TotalKarma)
+def total_karma_deleted(sender, instance, **kwargs):
+    KarmaRankIndex.remove(instance.user_id)
+
+
+@receiver(post_save, sender=UserRoleLink)
+@receiver(post_delete, sender=UserRoleLink)
+def user_role_link_changed(sender, instance, **kwargs):
+    # a role change can move a user between cohorts
+    KarmaRankIndex.refresh_user(instance.user_id)
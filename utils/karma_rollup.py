@@ -0,0 +1,252 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.db.models import Count, F, Q, Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from db.organization import Organization, UserOrganizationLink
+from db.task import KarmaActivityLog, TotalKarma
+from utils.utils import DateTimeUtils
+
+ROLLUP_TIMEOUT = 60 * 5
+
+ORG = "org"
+DISTRICT = "district"
+ZONE = "zone"
+STATE = "state"
+
+PARENT_LEVELS = (DISTRICT, ZONE, STATE)
+
+ROLLUP_FIELDS = (
+    "karma",
+    "verified_karma",
+    "members",
+    "verified_members",
+    "active_members",
+    "monthly_activity",
+)
+
+
+def fetch_org_rollups(org_ids=None) -> dict:
+    """
+    Aggregates karma and membership for every organization (or only ``org_ids``).
+
+    Counts are made over organization links, the same way the dashboards always
+    counted them: a user linked to two organizations is counted in both.
+    """
+    last_month = DateTimeUtils.get_current_utc_time() - timedelta(days=30)
+    start_date, end_date = DateTimeUtils.get_current_month_range()
+
+    organizations = Organization.objects.all()
+    if org_ids is not None:
+        organizations = organizations.filter(id__in=org_ids)
+
+    verified = Q(user_organization_link_org__verified=True)
+    rollups = {
+        org["id"]: org
+        for org in organizations.values(
+            "id",
+            "org_type",
+            "district_id",
+            zone_id=F("district__zone_id"),
+            state_id=F("district__zone__state_id"),
+        ).annotate(
+            karma=Sum("user_organization_link_org__user__total_karma_user__karma"),
+            verified_karma=Sum(
+                "user_organization_link_org__user__total_karma_user__karma", filter=verified
+            ),
+            members=Count("user_organization_link_org"),
+            verified_members=Count("user_organization_link_org", filter=verified),
+            active_members=Count(
+                "user_organization_link_org",
+                filter=verified
+                & Q(
+                    user_organization_link_org__user__active=True,
+                    user_organization_link_org__user__total_karma_user__created_at__gte=last_month,
+                ),
+            ),
+        )
+    }
+
+    # counted separately so the activity log join does not inflate the sums above
+    monthly_activity = dict(
+        organizations.annotate(
+            monthly_activity=Count(
+                "user_organization_link_org__user__karma_activity_log_user",
+                filter=Q(
+                    user_organization_link_org__user__karma_activity_log_user__created_at__gte=start_date,
+                    user_organization_link_org__user__karma_activity_log_user__created_at__lt=end_date,
+                ),
+            )
+        ).values_list("id", "monthly_activity")
+    )
+
+    for org_id, org in rollups.items():
+        org["karma"] = org["karma"] or 0
+        org["verified_karma"] = org["verified_karma"] or 0
+        org["monthly_activity"] = monthly_activity.get(org_id, 0)
+
+    return rollups
+
+
+def fetch_ig_karma(user_ids, ig_ids=None, approved_only=True) -> dict:
+    """
+    Returns the karma each of ``user_ids`` earned on the tasks of each interest group
+    (or only ``ig_ids``), keyed by ``(user_id, ig_id)``, with one grouped query.
+    Pairs without karma are left out.
+    """
+    logs = KarmaActivityLog.objects.filter(user_id__in=user_ids, task__ig__isnull=False)
+    if ig_ids is not None:
+        logs = logs.filter(task__ig_id__in=ig_ids)
+    if approved_only:
+        logs = logs.filter(appraiser_approved=True)
+
+    return {
+        (user_id, ig_id): karma
+        for user_id, ig_id, karma in logs.values_list("user_id", "task__ig_id")
+        .annotate(total=Sum("karma"))
+        .order_by()
+    }
+
+
+class _Rollup:
+    def __init__(self, orgs: dict):
+        self.levels = {ORG: orgs, DISTRICT: {}, ZONE: {}, STATE: {}}
+        self.children = {level: {} for level in PARENT_LEVELS}
+        self.ranks = {}
+        self.built_at = time.monotonic()
+
+        for org in orgs.values():
+            self._add(org, 1)
+
+    @property
+    def is_expired(self):
+        return time.monotonic() - self.built_at > ROLLUP_TIMEOUT
+
+    def _add(self, org, sign):
+        for level in PARENT_LEVELS:
+            if (parent_id := org[f"{level}_id"]) is None:
+                continue
+            parent = self.levels[level].setdefault(
+                parent_id, dict.fromkeys(ROLLUP_FIELDS, 0)
+            )
+            for field in ROLLUP_FIELDS:
+                parent[field] += sign * org[field]
+
+        self.children[DISTRICT].setdefault(org["district_id"], set()).add(org["id"])
+        self.children[ZONE].setdefault(org["zone_id"], set()).add(org["district_id"])
+
+    def replace(self, orgs: dict):
+        for org_id, org in orgs.items():
+            if old_org := self.levels[ORG].get(org_id):
+                self._add(old_org, -1)
+            self.levels[ORG][org_id] = org
+            self._add(org, 1)
+        self.ranks.clear()
+
+    def get_ranks(self, level, org_type=None) -> dict:
+        if (level, org_type) not in self.ranks:
+            ranked = sorted(
+                (
+                    (entity_id, entity["karma"])
+                    for entity_id, entity in self.levels[level].items()
+                    if entity["members"]
+                    and (org_type is None or entity["org_type"] == org_type)
+                ),
+                key=lambda x: x[1],
+                reverse=True,
+            )
+            self.ranks[level, org_type] = {
+                entity_id: i + 1 for i, (entity_id, _) in enumerate(ranked)
+            }
+        return self.ranks[level, org_type]
+
+
+class OrgKarmaRollup:
+    """
+    In-process rollup of karma, member count and active-member count per organization,
+    district, zone and state.
+
+    Organization rows are aggregated with two grouped queries, every other level is
+    summed from them. Karma and membership writes made through this service refresh
+    only the organizations they touch; the rollup is rebuilt every few minutes to pick
+    up writes made elsewhere.
+    """
+
+    _rollup = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_rollup(cls) -> _Rollup:
+        rollup = cls._rollup
+        if rollup is None or rollup.is_expired:
+            with cls._lock:
+                rollup = cls._rollup
+                if rollup is None or rollup.is_expired:
+                    rollup = cls._rollup = _Rollup(fetch_org_rollups())
+        return rollup
+
+    @classmethod
+    def get(cls, level, entity_id, org_type=None) -> dict:
+        """
+        Returns the rollup of an organization, district, zone or state along with its rank
+        by karma among its level. Organizations can be ranked among their own ``org_type``.
+        """
+        rollup = cls._get_rollup()
+        entity = rollup.levels[level].get(entity_id) or dict.fromkeys(ROLLUP_FIELDS, 0)
+        return entity | {"rank": rollup.get_ranks(level, org_type).get(entity_id)}
+
+    @classmethod
+    def get_top(cls, level, parent_id, count=3) -> list[tuple[str, int]]:
+        """
+        Returns the ``(id, verified_karma)`` of the ``count`` organizations (or districts)
+        with the most verified-member karma in a district (or zone).
+        """
+        parent_level = DISTRICT if level == ORG else ZONE
+        rollup = cls._get_rollup()
+        entities = rollup.levels[level]
+        ranked = sorted(
+            (
+                (entity_id, entities[entity_id]["verified_karma"])
+                for entity_id in rollup.children[parent_level].get(parent_id, ())
+                if entities[entity_id]["verified_members"]
+            ),
+            key=lambda x: x[1],
+            reverse=True,
+        )
+        return ranked[:count]
+
+    @classmethod
+    def refresh(cls, org_ids):
+        if cls._rollup is None or not org_ids:
+            return
+        orgs = fetch_org_rollups(org_ids)
+        with cls._lock:
+            if cls._rollup is not None:
+                cls._rollup.replace(orgs)
+
+    @classmethod
+    def refresh_user(cls, user_id):
+        if cls._rollup is None:
+            return
+        cls.refresh(
+            list(
+                UserOrganizationLink.objects.filter(user_id=user_id).values_list(
+                    "org_id", flat=True
+                )
+            )
+        )
+
+
+@receiver(post_save, sender=TotalKarma)
+@receiver(post_save, sender=KarmaActivityLog)
+def karma_saved(sender, instance, **kwargs):
+    OrgKarmaRollup.refresh_user(instance.user_id)
+
+
+@receiver(post_save, sender=UserOrganizationLink)
+@receiver(post_delete, sender=UserOrganizationLink)
+def user_organization_link_changed(sender, instance, **kwargs):
+    OrgKarmaRollup.refresh([instance.org_id])
@@ -1,13 +1,59 @@
+import functools
+import os
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
-from typing import Optional
 
 from PIL import Image, ImageDraw, ImageFont
 
-import time
-
 image_location = './api/dashboard/karma_voucher/assets/karmacard.png'
 font_location =  './api/dashboard/karma_voucher/fonts/Roboto-Light.ttf'
 
+# (field, position, font size) of every line printed on the card
+VOUCHER_LAYOUT = (
+    ('name', (135, 250), 60),
+    ('hashtag', (135, 450), 45),
+    ('karma', (920, 135), 45),
+    ('code', (135, 135), 20),
+    ('month', (135, 375), 30),
+)
+
+# batches smaller than this are rendered in the calling process
+POOL_THRESHOLD = 20
+
+ARCHIVE_SPOOL_SIZE = 32 * 1024 * 1024
+
+_pool = None
+
+
+@functools.lru_cache(maxsize=None)
+def load_voucher_assets():
+    """
+    Decodes the card template and loads its fonts once per process.
+    """
+    with Image.open(image_location) as image:
+        template = image.convert('RGB')
+    fonts = {size: ImageFont.truetype(font_location, size=size) for _, _, size in VOUCHER_LAYOUT}
+    return template, fonts
+
+
+def render_karma_voucher(name, hashtag, karma, code, month) -> bytes:
+    template, fonts = load_voucher_assets()
+    image = template.copy()
+    draw = ImageDraw.Draw(image)
+
+    values = {'name': name, 'hashtag': hashtag, 'karma': karma, 'code': code, 'month': month}
+    for field, position, size in VOUCHER_LAYOUT:
+        draw.text(position, values[field], fill=(255, 255, 255), font=fonts[size])
+
+    image_data = BytesIO()
+    image.save(image_data, format='JPEG')
+    return image_data.getvalue()
+
+
 def generate_karma_voucher(name, hashtag, karma, code, month):
     """
     Generate a karma voucher for the given users
@@ -17,41 +63,50 @@ def generate_karma_voucher(name, hashtag, karma, code, month):
     :param code:
     :param month:
     :return:
-    """   
+    """
+    return BytesIO(render_karma_voucher(name, hashtag, karma, code, month))
 
 
-    image = Image.open(image_location)
-    image = image.convert('RGB')
+def _render_voucher(voucher):
+    return render_karma_voucher(**voucher)
 
-    draw = ImageDraw.Draw(image)
-    x = 135
-    y = 250
-    font1 = ImageFont.truetype(font_location, size=60)
-    draw.text((x, y), name, fill=(255, 255, 255), font=font1)
-
-    x1 = 135
-    y1 = 450
-    font2 = ImageFont.truetype(font_location, size=45)
-    draw.text((x1, y1), hashtag, fill=(255, 255, 255), font=font2)
-
-    x2 = 920
-    y2 = 135
-    font3 = ImageFont.truetype(font_location, size=45)
-    draw.text((x2, y2), karma, fill=(255, 255, 255), font=font3)
-
-    x3 = 135
-    y3 = 135
-    font3 = ImageFont.truetype(font_location, size=20)
-    draw.text((x3, y3), code, fill=(255, 255, 255), font=font3)
-
-    x3 = 135
-    y3 = 375
-    font3 = ImageFont.truetype(font_location, size=30)
-    draw.text((x3, y3), month, fill=(255, 255, 255), font=font3)
 
-    image_data = BytesIO()
-    image.save(image_data, format='JPEG')
-    return image_data
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(initializer=load_voucher_assets)
+    return _pool
+
+
+def render_karma_vouchers(vouchers: list[dict]) -> list[bytes]:
+    """
+    Renders a batch of vouchers (dicts of generate_karma_voucher's arguments) as JPEG
+    bytes, in order. Large batches are spread over a process pool that lives as long
+    as the web worker.
+    """
+    global _pool
+    if len(vouchers) < POOL_THRESHOLD:
+        return [_render_voucher(voucher) for voucher in vouchers]
+
+    chunksize = max(1, len(vouchers) // (4 * (os.cpu_count() or 1)))
+    try:
+        return list(_get_pool().map(_render_voucher, vouchers, chunksize=chunksize))
+    except BrokenProcessPool:
+        _pool = None
+        return [_render_voucher(voucher) for voucher in vouchers]
+
+
+def build_voucher_archive(files):
+    """
+    Zips ``(filename, data)`` pairs. JPEGs are stored as is, they do not compress further.
+    Archives larger than ARCHIVE_SPOOL_SIZE are spooled to a temporary file.
+    """
+    archive = tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_SIZE)
+    with zipfile.ZipFile(archive, 'w', compression=zipfile.ZIP_STORED) as zip_file:
+        for filename, data in files:
+            zip_file.writestr(filename, data)
+    archive.seek(0)
+    return archive
 
 
 def generate_ordered_id(count):
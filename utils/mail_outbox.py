@@ -0,0 +1,196 @@
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENDING = "sending"
+DEAD = "dead"
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 5
+# seconds before the first retry, doubled after every failed attempt
+RETRY_BACKOFF = 60
+# messages claimed into SENDING this long ago belong to a worker that died mid-batch
+STALE_AFTER = 60 * 10
+POLL_INTERVAL = 30
+
+
+class MailOutbox:
+    """
+    Durable queue of outgoing mail.
+
+    Messages are pickled into settings.MAIL_OUTBOX_ROOT and sent in batches over one
+    SMTP connection. A worker claims a message by renaming it out of the pending
+    directory, so several workers can share the outbox. Failed messages are retried
+    with exponential backoff and moved to the dead-letter directory after MAX_ATTEMPTS.
+
+    settings.MAIL_WORKER picks who sends them: "thread" (a background thread of the
+    web process), "process" (`manage.py run_mail_worker`) or "sync" (sent right away,
+    inside the request).
+    """
+
+    @staticmethod
+    def _path(state, name=""):
+        directory = os.path.join(settings.MAIL_OUTBOX_ROOT, state)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, name)
+
+    @staticmethod
+    def _write(state, name, entry):
+        path = MailOutbox._path(state, name)
+        with open(f"{path}.tmp", "wb") as file:
+            pickle.dump(entry, file)
+        os.replace(f"{path}.tmp", path)
+
+    @staticmethod
+    def enqueue(message):
+        if settings.MAIL_WORKER == "sync":
+            message.send(fail_silently=False)
+            return
+
+        message.connection = None
+        entry = {"message": message, "attempts": 0, "next_attempt_at": 0, "error": None}
+        MailOutbox._write(PENDING, f"{time.time_ns()}-{uuid.uuid4().hex}.pickle", entry)
+
+        if settings.MAIL_WORKER == "thread":
+            OutboxThread.wake()
+
+    @staticmethod
+    def _claim_due(limit):
+        claimed = []
+        for name in sorted(os.listdir(MailOutbox._path(PENDING))):
+            if not name.endswith(".pickle"):
+                continue
+            try:
+                with open(MailOutbox._path(PENDING, name), "rb") as file:
+                    entry = pickle.load(file)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                continue
+            if entry["next_attempt_at"] > time.time():
+                continue
+
+            try:
+                os.rename(MailOutbox._path(PENDING, name), MailOutbox._path(SENDING, name))
+                # the rename keeps the mtime of the last write, staleness counts from here
+                os.utime(MailOutbox._path(SENDING, name))
+            except FileNotFoundError:
+                # claimed by another worker
+                continue
+            claimed.append((name, entry))
+            if len(claimed) >= limit:
+                break
+        return claimed
+
+    @staticmethod
+    def _release(name):
+        try:
+            os.remove(MailOutbox._path(SENDING, name))
+        except FileNotFoundError:
+            logger.warning("Mail %s was taken back from this worker as stale", name)
+
+    @staticmethod
+    def _retry(name, entry, error):
+        entry["attempts"] += 1
+        entry["error"] = repr(error)
+        entry["message"].connection = None
+        entry["next_attempt_at"] = time.time() + RETRY_BACKOFF * 2 ** (entry["attempts"] - 1)
+
+        if entry["attempts"] >= MAX_ATTEMPTS:
+            logger.error("Mail %s moved to dead letters: %r", name, error)
+            MailOutbox._write(DEAD, name, entry)
+        else:
+            logger.warning("Mail %s failed, attempt %s: %r", name, entry["attempts"], error)
+            MailOutbox._write(PENDING, name, entry)
+        MailOutbox._release(name)
+
+    @staticmethod
+    def process(batch_size=BATCH_SIZE) -> int:
+        """
+        Sends one batch of due messages and returns how many were attempted.
+        """
+        batch = MailOutbox._claim_due(batch_size)
+        if not batch:
+            return 0
+
+        try:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+        except Exception as e:
+            for name, entry in batch:
+                MailOutbox._retry(name, entry, e)
+            return len(batch)
+
+        try:
+            for name, entry in batch:
+                message = entry["message"]
+                message.connection = connection
+                try:
+                    message.send(fail_silently=False)
+                except Exception as e:
+                    MailOutbox._retry(name, entry, e)
+                else:
+                    MailOutbox._release(name)
+        finally:
+            connection.close()
+        return len(batch)
+
+    @staticmethod
+    def drain():
+        while MailOutbox.process():
+            pass
+
+    @staticmethod
+    def recover_stale():
+        for name in os.listdir(MailOutbox._path(SENDING)):
+            path = MailOutbox._path(SENDING, name)
+            try:
+                if os.path.getmtime(path) < time.time() - STALE_AFTER:
+                    os.rename(path, MailOutbox._path(PENDING, name))
+            except FileNotFoundError:
+                continue
+
+    @staticmethod
+    def get_dead_letters() -> list[dict]:
+        entries = []
+        for name in sorted(os.listdir(MailOutbox._path(DEAD))):
+            with open(MailOutbox._path(DEAD, name), "rb") as file:
+                entries.append(pickle.load(file) | {"name": name})
+        return entries
+
+
+class OutboxThread:
+    """
+    Background thread draining the outbox of the current process whenever mail is
+    queued, and every POLL_INTERVAL seconds for retries.
+    """
+
+    _event = threading.Event()
+    _thread = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def wake(cls):
+        with cls._lock:
+            if cls._thread is None or not cls._thread.is_alive():
+                cls._thread = threading.Thread(target=cls._run, daemon=True)
+                cls._thread.start()
+        cls._event.set()
+
+    @classmethod
+    def _run(cls):
+        while True:
+            cls._event.wait(POLL_INTERVAL)
+            cls._event.clear()
+            try:
+                MailOutbox.recover_stale()
+                MailOutbox.drain()
+            except Exception:
+                logger.exception("Mail outbox worker failed")
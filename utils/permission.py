@@ -1,8 +1,12 @@
-import datetime
-from datetime import datetime
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
 
 import jwt
 from django.conf import settings
+from django.core.cache import cache
 from django.http import HttpRequest
 from rest_framework import authentication
 from rest_framework.authentication import get_authorization_header
@@ -10,7 +14,6 @@ from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.permissions import BasePermission
 
 from mulearnbackend.settings import SECRET_KEY
-from utils.utils import DateTimeUtils
 from .exception import CustomException
 from .response import CustomResponse
 
@@ -66,14 +69,74 @@ class CustomizePermission(BasePermission):
         return f'{self.token_prefix} realm="api"'
 
 
+class _TokenCache:
+    """
+    Bounded LRU of verified token payloads. Entries are dropped once the token expires.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, token):
+        with self.lock:
+            if (entry := self.entries.get(token)) is None:
+                return None
+            if entry[1] < datetime.now(timezone.utc):
+                del self.entries[token]
+                return None
+            self.entries.move_to_end(token)
+            return entry
+
+    def set(self, token, payload, expiry):
+        with self.lock:
+            self.entries[token] = (payload, expiry)
+            self.entries.move_to_end(token)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+
 class JWTUtils:
+    TOKEN_CACHE_SIZE = 1024
+
+    _token_cache = _TokenCache(TOKEN_CACHE_SIZE)
+
+    @staticmethod
+    def decode(token):
+        """
+        Verifies a token and returns its payload along with its expiry (None if the
+        payload has no valid expiry). Verified tokens are cached until they expire.
+        """
+        if entry := JWTUtils._token_cache.get(token):
+            return entry
+
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"], verify=True)
+        try:
+            expiry = datetime.strptime(payload.get("expiry"), "%Y-%m-%d %H:%M:%S%z")
+        except (TypeError, ValueError):
+            return payload, None
+
+        JWTUtils._token_cache.set(token, payload, expiry)
+        return payload, expiry
+
+    @staticmethod
+    def get_payload(request):
+        """
+        Returns the verified payload of the request's bearer token, decoding it at most
+        once per request.
+        """
+        http_request = getattr(request, "_request", request)
+        payload = getattr(http_request, "jwt_payload", None)
+        if payload is None:
+            token = authentication.get_authorization_header(request).decode("utf-8").split()
+            payload, _ = JWTUtils.decode(token[1])
+            http_request.jwt_payload = payload
+        return payload
+
     @staticmethod
     def fetch_role(request):
-        token = authentication.get_authorization_header(request).decode("utf-8").split()
-        payload = jwt.decode(
-            token[1], settings.SECRET_KEY, algorithms=["HS256"], verify=True
-        )
-        roles = payload.get("roles")
+        roles = JWTUtils.get_payload(request).get("roles")
         if roles is None:
             raise Exception(
                 "The corresponding JWT token does not contain the 'roles' key"
@@ -82,11 +145,7 @@ class JWTUtils:
 
     @staticmethod
     def fetch_user_id(request):
-        token = authentication.get_authorization_header(request).decode("utf-8").split()
-        payload = jwt.decode(
-            token[1], settings.SECRET_KEY, algorithms=["HS256"], verify=True
-        )
-        user_id = payload.get("id")
+        user_id = JWTUtils.get_payload(request).get("id")
         if user_id is None:
             raise Exception(
                 "The corresponding JWT token does not contain the 'user_id' key"
@@ -95,11 +154,7 @@ class JWTUtils:
 
     @staticmethod
     def fetch_muid(request):
-        token = authentication.get_authorization_header(request).decode("utf-8").split()
-        payload = jwt.decode(
-            token[1], settings.SECRET_KEY, algorithms=["HS256"], verify=True
-        )
-        muid = payload.get("muid")
+        muid = JWTUtils.get_payload(request).get("muid")
         if muid is None:
             raise Exception(
                 "The corresponding JWT token does not contain the 'muid' key"
@@ -109,7 +164,6 @@ class JWTUtils:
     @staticmethod
     def is_jwt_authenticated(request):
         token_prefix = "Bearer"
-        secret_key = SECRET_KEY
         try:
             auth_header = get_authorization_header(request).decode("utf-8")
             if not auth_header or not auth_header.startswith(token_prefix):
@@ -119,14 +173,14 @@ class JWTUtils:
             if not token:
                 raise CustomException("Empty Token")
 
-            payload = jwt.decode(token, secret_key, algorithms=["HS256"], verify=True)
+            payload, expiry = JWTUtils.decode(token)
 
             user_id = payload.get("id")
-            expiry = datetime.strptime(payload.get("expiry"), "%Y-%m-%d %H:%M:%S%z")
 
-            if not user_id or expiry < DateTimeUtils.get_current_utc_time():
+            if not user_id or expiry is None or expiry < datetime.now(timezone.utc):
                 raise CustomException("Token Expired or Invalid")
 
+            getattr(request, "_request", request).jwt_payload = payload
             return None, payload
         except jwt.exceptions.InvalidSignatureError as e:
             raise CustomException(
@@ -172,11 +226,54 @@ def role_required(roles):
 
     return decorator
 
+class DynamicRoleCache:
+    """
+    Role titles granted by each dynamic role type.
+
+    Mappings are shared between workers through the cache under a version that is
+    replaced whenever dynamic roles change, and each worker keeps the mappings of the
+    current version in memory, so a permission check costs one cache read.
+    """
+
+    VERSION_KEY = "dynamic_role:version"
+    TIMEOUT = 60 * 60
+
+    _version = None
+    _roles = {}
+
+    @classmethod
+    def get_version(cls):
+        if (version := cache.get(cls.VERSION_KEY)) is None:
+            cache.add(cls.VERSION_KEY, uuid.uuid4().hex, None)
+            version = cache.get(cls.VERSION_KEY)
+        return version
+
+    @classmethod
+    def get_roles(cls, type) -> frozenset:
+        version = cls.get_version()
+        if version != cls._version:
+            cls._version, cls._roles = version, {}
+
+        roles, expires_at = cls._roles.get(type, (None, 0))
+        if roles is None or expires_at < time.monotonic():
+            key = f"dynamic_role:{version}:{type}"
+            if (roles := cache.get(key)) is None:
+                roles = frozenset(
+                    DynamicRole.objects.filter(type=type).values_list("role__title", flat=True)
+                )
+                cache.set(key, roles, cls.TIMEOUT)
+            cls._roles[type] = (roles, time.monotonic() + cls.TIMEOUT)
+        return roles
+
+    @classmethod
+    def invalidate(cls):
+        cache.set(cls.VERSION_KEY, uuid.uuid4().hex, None)
+
+
 def dynamic_role_required(type):
     def decorator(view_func):
         def wrapped_view_func(obj, request, *args, **kwargs):
-            dynamic_roles = DynamicRole.objects.filter(type=type).values_list('role__title', flat=True)
-            roles = set(dynamic_roles)
+            roles = DynamicRoleCache.get_roles(type)
             for role in JWTUtils.fetch_role(request):
                 if role in roles:
                     response = view_func(obj, request, *args, **kwargs)
@@ -0,0 +1,99 @@
+import uuid
+from datetime import timedelta
+
+import jwt
+from django.conf import settings
+
+from db.organization import Country, District, Organization, State, UserOrganizationLink, Zone
+from db.task import InterestGroup, TotalKarma
+from db.user import User
+from utils.utils import DateTimeUtils
+
+
+def make_user(name, **fields) -> User:
+    return User.objects.create(
+        id=str(uuid.uuid4()),
+        mu_id=f"{name}@mulearn",
+        first_name=name,
+        email=f"{name}@mulearn.org",
+        mobile="9000000000",
+        created_at=DateTimeUtils.get_current_utc_time(),
+        **fields,
+    )
+
+
+def make_district(admin, name="District") -> District:
+    audit = dict(
+        created_by=admin,
+        updated_by=admin,
+        created_at=DateTimeUtils.get_current_utc_time(),
+        updated_at=DateTimeUtils.get_current_utc_time(),
+    )
+    country = Country.objects.create(id=str(uuid.uuid4()), name=f"{name} country", **audit)
+    state = State.objects.create(id=str(uuid.uuid4()), name=f"{name} state", country=country, **audit)
+    zone = Zone.objects.create(id=str(uuid.uuid4()), name=f"{name} zone", state=state, **audit)
+    return District.objects.create(id=str(uuid.uuid4()), name=name, zone=zone, **audit)
+
+
+def make_org(admin, district, code, org_type) -> Organization:
+    return Organization.objects.create(
+        id=str(uuid.uuid4()),
+        title=f"{code} title",
+        code=code,
+        org_type=org_type,
+        district=district,
+        created_by=admin,
+        updated_by=admin,
+        created_at=DateTimeUtils.get_current_utc_time(),
+        updated_at=DateTimeUtils.get_current_utc_time(),
+    )
+
+
+def link_org(user, org, verified=True) -> UserOrganizationLink:
+    return UserOrganizationLink.objects.create(
+        id=str(uuid.uuid4()),
+        user=user,
+        org=org,
+        verified=verified,
+        created_by=user,
+        created_at=DateTimeUtils.get_current_utc_time(),
+    )
+
+
+def give_karma(user, karma) -> TotalKarma:
+    return TotalKarma.objects.create(
+        id=str(uuid.uuid4()),
+        user=user,
+        karma=karma,
+        created_by=user,
+        updated_by=user,
+        created_at=DateTimeUtils.get_current_utc_time(),
+        updated_at=DateTimeUtils.get_current_utc_time(),
+    )
+
+
+def make_token(user, roles) -> str:
+    """
+    Returns an access token for ``user`` holding ``roles``, as the auth service signs it.
+    """
+    expiry = DateTimeUtils.get_current_utc_time() + timedelta(hours=1)
+    payload = {
+        "id": user.id,
+        "muid": user.mu_id,
+        "roles": roles,
+        "expiry": expiry.strftime("%Y-%m-%d %H:%M:%S%z"),
+    }
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm="HS256")
+
+
+def make_interest_group(admin, code) -> InterestGroup:
+    return InterestGroup.objects.create(
+        id=str(uuid.uuid4()),
+        name=f"{code} group",
+        code=code,
+        icon=code,
+        created_by=admin,
+        updated_by=admin,
+        created_at=DateTimeUtils.get_current_utc_time(),
+        updated_at=DateTimeUtils.get_current_utc_time(),
+    )
@@ -0,0 +1,70 @@
+import time
+
+from django.db.models import F
+from django.test import TestCase
+
+from db.task import TotalKarma
+from db.user import User
+from utils.karma_rank import KarmaRankIndex
+from utils.testing import give_karma, link_org, make_district, make_org, make_user
+from utils.types import OrganizationType
+from utils.utils import CommonUtils
+
+
+class IterateInChunksTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        admin = make_user("admin")
+        district = make_district(admin)
+        orgs = [
+            make_org(admin, district, f"ORG{i}", OrganizationType.COMPANY.value) for i in range(3)
+        ]
+        # three rows for this user, straddling a chunk boundary of two
+        cls.linked_user = make_user("linked")
+        for org in orgs:
+            link_org(cls.linked_user, org)
+        make_user("plain")
+
+    def iterate(self, queryset, chunk_size):
+        return [row for chunk in CommonUtils.iterate_in_chunks(queryset, chunk_size) for row in chunk]
+
+    def test_walks_plain_querysets_by_primary_key(self):
+        rows = self.iterate(User.objects.all(), 2)
+        self.assertEqual([row.pk for row in rows], sorted(User.objects.values_list("pk", flat=True)))
+
+    def test_keeps_every_row_of_a_multi_valued_join(self):
+        # annotated across organization links the way UserManagementCSV.get_rows is
+        queryset = User.objects.annotate(company=F("user_organization_link_user__org__title"))
+        rows = self.iterate(queryset, 2)
+
+        self.assertEqual(len(rows), len(queryset))
+        self.assertEqual(sum(row.pk == self.linked_user.pk for row in rows), 3)
+
+    def test_keeps_the_callers_ordering(self):
+        queryset = User.objects.order_by("-first_name")
+        rows = self.iterate(queryset, 2)
+        self.assertEqual([row.pk for row in rows], [user.pk for user in queryset])
+
+
+class KarmaRankIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i, karma in enumerate([300, 200, 100]):
+            give_karma(make_user(f"learner{i}"), karma)
+        cls.user = make_user("climber")
+        give_karma(cls.user, 50)
+
+    def setUp(self):
+        KarmaRankIndex._indexes.clear()
+        self.addCleanup(KarmaRankIndex._indexes.clear)
+        self.assertEqual(KarmaRankIndex.get_rank([], 50), 4)
+        # written behind the index's back, like the Discord bot does
+        TotalKarma.objects.filter(user=self.user).update(karma=250)
+
+    def test_ranks_the_user_by_their_fresh_karma(self):
+        self.assertEqual(KarmaRankIndex.get_rank([], 250, self.user.id, time.time()), 2)
+        self.assertEqual(KarmaRankIndex.get_rank([], 200), 3)
+
+    def test_ignores_karma_read_before_the_index(self):
+        self.assertEqual(KarmaRankIndex.get_rank([], 40, self.user.id, time.time() - 60), 4)
+        self.assertEqual(KarmaRankIndex.get_rank([], 50), 4)
@@ -1,20 +1,98 @@
+import base64
+import binascii
 import csv
 import datetime
-import gzip
 import io
+import itertools
+import json
+import zlib
 
 import decouple
 import openpyxl
 import pytz
-import requests
-from decouple import config
-from django.core.mail import send_mail
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Q
+from django.db.models import F, Q
 from django.db.models.query import QuerySet
-from django.http import HttpResponse
+from django.db.models.sql.datastructures import Join
+from django.http import StreamingHttpResponse
 from django.template.loader import render_to_string
-from django.core.mail import EmailMessage
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+
+from utils.discord_webhook import DiscordWebhookDispatcher
+from utils.mail_outbox import MailOutbox
+
+CSV_CHUNK_SIZE = 2000
+CSV_FLUSH_SIZE = 64 * 1024
+IMPORT_CHUNK_SIZE = 5000
+
+
+def _encode_cursor(direction, values) -> str:
+    data = json.dumps([direction, values], default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def _decode_cursor(cursor, size):
+    """
+    Returns the direction and ordering values of a cursor, or ("next", None) for the
+    first page or a cursor that does not fit the current ordering.
+    """
+    try:
+        direction, values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (AttributeError, ValueError, TypeError, binascii.Error):
+        return "next", None
+    if direction not in ("next", "prev") or not isinstance(values, list) or len(values) != size:
+        return "next", None
+    return direction, values
+
+
+def _keyset_order(name, descending):
+    # nulls sort as the smallest value on every database, which _keyset_filter relies on
+    return F(name).desc(nulls_last=True) if descending else F(name).asc(nulls_first=True)
+
+
+def _keyset_filter(keys, values, before=False) -> Q:
+    """
+    Matches the rows that come after (or before) ``values`` in the ordering of ``keys``,
+    or returns None if there are none.
+    """
+    query = None
+    equal = Q()
+    for (name, _, descending), value in zip(keys, values):
+        if descending == before:
+            beyond = Q(**{f"{name}__isnull": False}) if value is None else Q(**{f"{name}__gt": value})
+        elif value is not None:
+            beyond = Q(**{f"{name}__lt": value}) | Q(**{f"{name}__isnull": True})
+        else:
+            # nothing sorts below null
+            beyond = None
+
+        if beyond is not None:
+            query = equal & beyond if query is None else query | (equal & beyond)
+        equal &= Q(**{f"{name}__isnull": True}) if value is None else Q(**{name: value})
+    return query
+
+
+def _pop_cursor_values(row, keys) -> list:
+    if isinstance(row, dict):
+        return [row.pop(name) for name, _, _ in keys]
+    return [getattr(row, name) for name, _, _ in keys]
+
+
+def _stream_gzipped_csv(rows, fieldnames):
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CSV_FLUSH_SIZE:
+            if data := compressor.compress(buffer.getvalue().encode()):
+                yield data
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield compressor.compress(buffer.getvalue().encode()) + compressor.flush()
 
 
 class CommonUtils:
@@ -45,6 +123,9 @@ class CommonUtils:
 
                 queryset = queryset.order_by(sort_field_name)
 
+        if "cursor" in request.query_params:
+            return CommonUtils.get_cursor_paginated_queryset(queryset, request, per_page)
+
         paginator = Paginator(queryset, per_page)
         try:
             queryset = paginator.page(page)
@@ -67,24 +148,154 @@ class CommonUtils:
         }
 
     @staticmethod
-    def generate_csv(queryset: QuerySet, csv_name: str) -> HttpResponse:
-        response = HttpResponse(content_type="text/csv")
+    def get_cursor_paginated_queryset(queryset: QuerySet, request, per_page: int) -> dict:
+        """
+        Keyset pagination over the queryset's ordering, for clients that send a
+        ``cursor`` query param (empty for the first page).
+
+        Pages are fetched with a WHERE on the ordering columns of the last (or first)
+        row seen instead of an OFFSET, so deep pages cost the same as the first one.
+        The total count is only computed when ``withCount=true`` is also sent.
+        """
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        ordering = [
+            field
+            for field in ordering
+            if isinstance(field, str) and field.lstrip("-") not in ("pk", "id", "?")
+        ]
+        if queryset.query.group_by is None:
+            # keeps the ordering total when the sort field has duplicates
+            ordering.append("pk")
+        else:
+            ordering.extend(queryset.query.values_select)
+
+        keys = [
+            (f"pagination_cursor_{i}", field.lstrip("-"), field.startswith("-"))
+            for i, field in enumerate(ordering)
+        ]
+        base_queryset = queryset
+        queryset = queryset.annotate(**{name: F(field) for name, field, _ in keys})
+
+        direction, values = _decode_cursor(request.query_params.get("cursor"), len(keys))
+        is_prev = direction == "prev"
+        if values is not None:
+            keyset = _keyset_filter(keys, values, before=is_prev)
+            queryset = queryset.none() if keyset is None else queryset.filter(keyset)
+
+        queryset = queryset.order_by(
+            *(
+                _keyset_order(name, descending != is_prev)
+                for name, _, descending in keys
+            )
+        )
+        rows = list(queryset[: per_page + 1])
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        if is_prev:
+            rows.reverse()
+
+        cursors = [_pop_cursor_values(row, keys) for row in rows]
+        has_next = (not is_prev and has_more) or (is_prev and values is not None)
+        has_prev = (is_prev and has_more) or (not is_prev and values is not None)
+
+        count = None
+        if request.query_params.get("withCount") == "true":
+            count = base_queryset.count()
+
+        return {
+            "queryset": rows,
+            "pagination": {
+                "count": count,
+                "totalPages": None,
+                "isNext": has_next,
+                "isPrev": has_prev,
+                "nextPage": None,
+                "nextCursor": _encode_cursor("next", cursors[-1]) if has_next and rows else None,
+                "prevCursor": _encode_cursor("prev", cursors[0]) if has_prev and rows else None,
+            },
+        }
+
+    @staticmethod
+    def generate_csv(rows, csv_name: str, fieldnames: list = None) -> StreamingHttpResponse:
+        """
+        Streams ``rows`` (dicts, or a ``.values()`` queryset) as a gzipped CSV download.
+        """
+        response = StreamingHttpResponse(
+            CommonUtils.iter_gzipped_csv(rows, fieldnames), content_type="text/csv"
+        )
         response["Content-Disposition"] = f'attachment; filename="{csv_name}.csv"'
-        fieldnames = list(queryset[0].keys())
-        writer = csv.DictWriter(response, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(queryset)
-
-        compressed_response = HttpResponse(
-            gzip.compress(response.content),
-            content_type="text/csv",
+        response["Content-Encoding"] = "gzip"
+        return response
+
+    @staticmethod
+    def iter_gzipped_csv(rows, fieldnames: list = None):
+        """
+        Yields ``rows`` as gzip-compressed CSV.
+
+        Rows are written and compressed a chunk at a time, so memory use does not grow
+        with the size of the export. Columns default to the keys of the first row.
+        """
+        if isinstance(rows, QuerySet):
+            rows = rows.iterator(chunk_size=CSV_CHUNK_SIZE)
+        rows = iter(rows)
+
+        if fieldnames is None:
+            first_row = next(rows, None)
+            fieldnames = list(first_row.keys()) if first_row else []
+            if first_row is not None:
+                rows = itertools.chain([first_row], rows)
+
+        return _stream_gzipped_csv(rows, fieldnames)
+
+    @staticmethod
+    def _has_one_row_per_pk(queryset: QuerySet) -> bool:
+        query = queryset.query
+        if query.distinct or query.group_by is not None:
+            return True
+        # a join to the many side of a relation repeats the row for every match
+        return not any(
+            getattr(join.join_field, "one_to_many", False) or getattr(join.join_field, "many_to_many", False)
+            for join in query.alias_map.values()
+            if isinstance(join, Join)
         )
-        compressed_response[
-            "Content-Disposition"
-        ] = f'attachment; filename="{csv_name}.csv"'
-        compressed_response["Content-Encoding"] = "gzip"
 
-        return compressed_response
+    @staticmethod
+    def iterate_in_chunks(queryset: QuerySet, chunk_size: int = CSV_CHUNK_SIZE):
+        """
+        Yields the queryset in lists of ``chunk_size`` rows.
+
+        Model querysets with one row per primary key and no ordering of their own are
+        walked by primary key, one bounded query per chunk, because MySQL drivers buffer
+        a whole result set even for ``iterator()``. Other querysets fall back to
+        ``iterator()``, so rows sharing a primary key are not split across chunks and
+        the caller's ordering is kept.
+        """
+        if (
+            queryset._fields is not None
+            or queryset.query.is_sliced
+            or queryset.query.order_by
+            or not CommonUtils._has_one_row_per_pk(queryset)
+        ):
+            rows = queryset.iterator(chunk_size=chunk_size)
+            while chunk := list(itertools.islice(rows, chunk_size)):
+                yield chunk
+            return
+
+        queryset = queryset.order_by("pk")
+        chunk = list(queryset[:chunk_size])
+        while chunk:
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+            chunk = list(queryset.filter(pk__gt=chunk[-1].pk)[:chunk_size])
+
+    @staticmethod
+    def serialize_in_chunks(queryset: QuerySet, serializer_class, context: dict = None):
+        """
+        Yields the serialized rows of a queryset, serializing one chunk at a time.
+        """
+        for chunk in CommonUtils.iterate_in_chunks(queryset):
+            yield from serializer_class(chunk, many=True, context=context or {}).data
 
 
 class DateTimeUtils:
@@ -103,20 +314,33 @@ class DateTimeUtils:
         local_now = datetime.datetime.now(pytz.timezone("UTC"))
         return DateTimeUtils.format_time(local_now)
 
+    @staticmethod
+    def get_current_month_range() -> tuple[datetime.datetime, datetime.datetime]:
+        """
+        Returns the start of the current month and the start of the next month in UTC.
+
+        Returns:
+            tuple: The (inclusive) start and (exclusive) end of the current month.
+        """
+        start_date = DateTimeUtils.get_current_utc_time().replace(
+            day=1, hour=0, minute=0, second=0
+        )
+        end_date = (start_date + datetime.timedelta(days=32)).replace(day=1)
+        return start_date, end_date
+
     @staticmethod
     def format_time(date_time: datetime.datetime) -> datetime.datetime:
         """
-        Formats a datetime object to the format '%Y-%m-%d %H:%M:%S'.
+        Truncates a datetime object to whole seconds, keeping its timezone.
 
         Args:
-            date_time (datetime.datetime): The datetime object to format.
+            date_time (datetime.datetime): The datetime object to truncate.
 
         Returns:
-            datetime.datetime: The formatted datetime object.
+            datetime.datetime: The same datetime with microseconds set to zero.
         """
 
-        formatted_time = date_time.strftime("%Y-%m-%d %H:%M:%S %z")
-        return datetime.datetime.strptime(formatted_time, "%Y-%m-%d %H:%M:%S %z")
+        return date_time.replace(microsecond=0)
 
 
 class _CustomHTTPHandler:
@@ -143,25 +367,55 @@ class DiscordWebhooks:
         content = f"{category}<|=|>{action}"
         for value in values:
             content = f"{content}<|=|>{value}"
-        url = config("DISCORD_WEBHOOK_LINK")
-        data = {"content": content}
-        requests.post(url, json=data)
+        DiscordWebhookDispatcher.dispatch(content)
 
 
 class ImportCSV:
-    def read_excel_file(self, file_obj):
-        workbook = openpyxl.load_workbook(filename=io.BytesIO(file_obj.read()))
-        sheet = workbook.active
+    """
+    Reads uploaded .xlsx and .csv sheets lazily, one row at a time, so large uploads
+    are never held in memory as a whole.
+    """
 
-        rows = []
-        for row in sheet.iter_rows(values_only=True):
-            row_dict = {
-                header.value: cell_value for header, cell_value in zip(sheet[1], row)
-            }
-            rows.append(row_dict)
-        workbook.close()
+    @staticmethod
+    def read_rows(file_obj):
+        """
+        Returns the header row of the sheet and an iterator over the remaining rows as
+        dicts keyed by header. Blank rows are skipped. Headers are None for an empty file.
+        """
+        if file_obj.name.lower().endswith(".csv"):
+            rows = ImportCSV._iter_csv(file_obj)
+        else:
+            rows = ImportCSV._iter_excel(file_obj)
+
+        headers = next(rows, None)
+        if headers is None:
+            return None, iter(())
+        headers = list(headers)
+        return headers, (
+            dict(zip(headers, itertools.chain(row, itertools.repeat(None))))
+            for row in rows
+            if any(value is not None for value in row)
+        )
 
-        return rows
+    @staticmethod
+    def _iter_excel(file_obj):
+        workbook = openpyxl.load_workbook(file_obj, read_only=True, data_only=True)
+        try:
+            yield from workbook.active.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _iter_csv(file_obj):
+        text = io.TextIOWrapper(file_obj, encoding="utf-8-sig", newline="")
+        for row in csv.reader(text):
+            yield [value if value != "" else None for value in row]
+
+    @staticmethod
+    def iter_chunks(rows, chunk_size=IMPORT_CHUNK_SIZE):
+        rows = iter(rows)
+        while chunk := list(itertools.islice(rows, chunk_size)):
+            yield chunk
 
 
 def send_template_mail(
@@ -191,14 +445,13 @@ def send_template_mail(
         mail = context["email"]
 
     if attachment is None:
-        send_mail(
+        email = EmailMultiAlternatives(
             subject=subject,
-            message=email_content,
+            body=email_content,
             from_email=from_mail,
-            recipient_list=[mail],
-            html_message=email_content,
-            fail_silently=False,
+            to=[mail],
         )
+        email.attach_alternative(email_content, "text/html")
 
     else:
         email = EmailMessage(
@@ -209,4 +462,5 @@ def send_template_mail(
         )
         email.attach(attachment)
         email.content_subtype = "html"
-        email.send()
+
+    MailOutbox.enqueue(email)